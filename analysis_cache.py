@@ -0,0 +1,128 @@
+import os
+import re
+import json
+import time
+import difflib
+import hashlib
+import sqlite3
+import logging
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.getenv("ANALYSIS_CACHE_DB", "career_navigator_cache.db")
+
+ATS_SCORE_RE = re.compile(r"ATS Score:\s*(\d+)\s*/\s*100", re.IGNORECASE)
+
+
+def content_hash(text: str) -> str:
+    """Stable hash of normalized text, insensitive to whitespace-only edits"""
+    normalized = " ".join(text.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class AnalysisCache:
+    """Content-addressed store for NER results and chain outputs, shared across processes"""
+
+    def __init__(self, db_path: str = DEFAULT_CACHE_PATH):
+        self.db_path = db_path
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _init_schema(self):
+        conn = self._connect()
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS artifacts (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute("SELECT value FROM artifacts WHERE key = ?", (key,)).fetchone()
+            finally:
+                conn.close()
+            return json.loads(row[0]) if row else None
+        except Exception as e:
+            logger.error(f"Failed to read analysis cache: {e}")
+            return None
+
+    def set(self, key: str, value: Any):
+        try:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO artifacts (key, value, created_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), time.time())
+                )
+            finally:
+                conn.close()
+        except Exception as e:
+            logger.error(f"Failed to write analysis cache: {e}")
+
+
+def parse_ats_score(feedback: str) -> Optional[int]:
+    """Pull the numeric score out of ATS feedback text"""
+    match = ATS_SCORE_RE.search(feedback or "")
+    return int(match.group(1)) if match else None
+
+
+def _text_diff(previous: str, current: str) -> str:
+    return "\n".join(difflib.unified_diff(
+        (previous or "").splitlines(),
+        (current or "").splitlines(),
+        fromfile="previous",
+        tofile="current",
+        lineterm=""
+    ))
+
+
+def compare_analyses(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Describe what changed between two analysis results of the same resume"""
+    previous_score = parse_ats_score(previous.get("ats_feedback", ""))
+    current_score = parse_ats_score(current.get("ats_feedback", ""))
+
+    previous_sections = previous.get("section_hashes", {})
+    current_sections = current.get("section_hashes", {})
+
+    previous_keywords = set(previous.get("keywords", []))
+    current_keywords = set(current.get("keywords", []))
+
+    return {
+        "ats_score": {
+            "previous": previous_score,
+            "current": current_score,
+            "delta": current_score - previous_score
+            if previous_score is not None and current_score is not None else None
+        },
+        "role": {
+            "previous": previous.get("role"),
+            "current": current.get("role"),
+            "changed": previous.get("role") != current.get("role")
+        },
+        "sections": {
+            "added": [s for s in current_sections if s not in previous_sections],
+            "removed": [s for s in previous_sections if s not in current_sections],
+            "modified": [s for s in current_sections
+                         if s in previous_sections and previous_sections[s] != current_sections[s]],
+            "unchanged": [s for s in current_sections
+                          if s in previous_sections and previous_sections[s] == current_sections[s]]
+        },
+        "keywords": {
+            "added": sorted(current_keywords - previous_keywords),
+            "removed": sorted(previous_keywords - current_keywords)
+        },
+        "ats_feedback_diff": _text_diff(previous.get("ats_feedback"), current.get("ats_feedback")),
+        "summary_diff": _text_diff(previous.get("summary"), current.get("summary"))
+    }
@@ -0,0 +1,122 @@
+import re
+import logging
+import numpy as np
+from typing import List, Dict, Any, Optional
+
+from jd_matching import tokenize
+from embedding_index import HashingEmbedder
+
+logger = logging.getLogger(__name__)
+
+# Answers in this word range read as complete without rambling
+IDEAL_MIN_WORDS = 80
+IDEAL_MAX_WORDS = 250
+MIN_WORDS = 15
+MAX_WORDS = 450
+# Share of distinct content words below which an answer reads as repetition or keyword stuffing
+MIN_UNIQUE_RATIO = 0.5
+
+STAR_MARKERS = {
+    "situation": re.compile(
+        r"\b(when i was|at my (previous|last|current)|in my (previous|last|current) (role|job|position)|"
+        r"situation|context|background|we had|there was|the project|our team)\b"),
+    "task": re.compile(
+        r"\b(my (goal|task|job|responsibility|role) was|i was (responsible|asked|tasked)|"
+        r"needed to|had to|objective|challenge was|the goal)\b"),
+    "action": re.compile(
+        r"\bi (built|designed|implemented|led|wrote|created|introduced|migrated|analy[sz]ed|automated|"
+        r"refactored|proposed|set up|organi[sz]ed|coordinated|decided|used|added|reduced|optimi[sz]ed|"
+        r"started|worked with|collaborated)\b"),
+    "result": re.compile(
+        r"\b(as a result|result(ed|s)? in|which (led|cut|reduced|saved|increased|improved)|outcome|"
+        r"impact|reduced|increased|improved|saved|cut|grew|delivered|achieved)\b|\d+(\.\d+)?\s*(%|percent|x\b)")
+}
+METRIC_RE = re.compile(r"\b\d+(\.\d+)?\s*(%|percent|x|ms|s|seconds|minutes|hours|days|k|m|users|customers)?\b")
+
+WEIGHTS = {"length": 0.2, "structure": 0.3, "keywords": 0.25, "similarity": 0.25}
+
+
+class AnswerPreScorer:
+    """Millisecond heuristic score for an interview answer, shown while the LLM evaluates it.
+
+    Combines answer length, STAR structure, overlap with the question, role
+    and resume keywords, and hashed-embedding similarity to the question.
+    The score is a rough 1-10 estimate, not a substitute for the LLM's
+    judgement of content.
+    """
+
+    def __init__(self, embedder=None):
+        self.embedder = embedder or HashingEmbedder()
+
+    @staticmethod
+    def _length_score(words: int) -> float:
+        if words < IDEAL_MIN_WORDS:
+            return float(np.clip((words - MIN_WORDS) / (IDEAL_MIN_WORDS - MIN_WORDS), 0.0, 1.0))
+        if words > IDEAL_MAX_WORDS:
+            return float(np.clip(1.0 - (words - IDEAL_MAX_WORDS) / (MAX_WORDS - IDEAL_MAX_WORDS), 0.3, 1.0))
+        return 1.0
+
+    def score(self, role: str, question: str, answer: str,
+              keywords: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Provisional score, per-component breakdown and rubric hints for an answer"""
+        text = answer.lower()
+        words = len(answer.split())
+
+        star = {part: bool(pattern.search(text)) for part, pattern in STAR_MARKERS.items()}
+        has_metric = bool(METRIC_RE.search(text))
+
+        answer_tokens = tokenize(answer)
+        answer_terms = set(answer_tokens)
+        # Repeating the question's words inflates length, overlap and similarity alike
+        unique_ratio = len(answer_terms) / len(answer_tokens) if answer_tokens else 1.0
+        diversity = float(np.clip(unique_ratio / MIN_UNIQUE_RATIO, 0.0, 1.0))
+        prompt_terms = set(tokenize(f"{question} {role}"))
+        keyword_terms = {t for k in (keywords or []) for t in tokenize(k)}
+        prompt_overlap = len(prompt_terms & answer_terms) / max(1, min(len(prompt_terms), 8))
+        keyword_overlap = len(keyword_terms & answer_terms) / max(1, min(len(keyword_terms), 5))
+        keyword_score = min(1.0, prompt_overlap) if not keyword_terms else \
+            min(1.0, 0.7 * min(1.0, prompt_overlap) + 0.3 * min(1.0, keyword_overlap))
+        keyword_score *= diversity
+
+        # Stopwords would dominate the hashed vectors of short answers
+        vectors = self.embedder.embed([" ".join(tokenize(f"{role} {question}")), " ".join(tokenize(answer))])
+        similarity = float(vectors[0] @ vectors[1])
+
+        components = {
+            "length": self._length_score(words) * diversity,
+            "structure": min(1.0, sum(star.values()) / 4 + (0.1 if has_metric else 0.0)),
+            "keywords": keyword_score,
+            # Hashed bag-of-words cosine rarely goes much above 0.4 for an on-topic answer
+            "similarity": float(np.clip(similarity / 0.4, 0.0, 1.0)) * diversity
+        }
+        total = sum(WEIGHTS[name] * value for name, value in components.items())
+
+        hints = []
+        if words < IDEAL_MIN_WORDS:
+            hints.append("Expand your answer with a concrete example.")
+        elif words > IDEAL_MAX_WORDS:
+            hints.append("Tighten your answer; aim for two minutes or less.")
+        if diversity < 1.0:
+            hints.append("Avoid repeating the same words; describe what you did in your own words.")
+        missing = [part for part, present in star.items() if not present]
+        if missing:
+            hints.append(f"Use the STAR method; add the {', '.join(missing)}.")
+        if not has_metric:
+            hints.append("Quantify the impact with a number or metric.")
+        if components["keywords"] < 0.4 or components["similarity"] < 0.4:
+            hints.append("Tie your answer more directly to the question and the role.")
+
+        return {
+            "score": int(round(1 + 9 * total)),
+            "components": {name: round(value, 2) for name, value in components.items()},
+            "star": star,
+            "words": words,
+            "hints": hints,
+            "provisional": True
+        }
+
+
+def format_provisional_evaluation(result: Dict[str, Any], reason: str) -> str:
+    """Render a pre-score in the same "Score: N/10" shape as the LLM evaluation"""
+    hints = " ".join(result["hints"]) or "Well-structured answer."
+    return f"Score: {result['score']}/10\nEvaluation: {reason} {hints}"
@@ -1,26 +1,67 @@
+import io
 import os
+import json
+import hashlib
 import fitz  # PyMuPDF
-import docx
 import logging
 from dotenv import load_dotenv
 from transformers import pipeline
-from langchain_groq import ChatGroq
 from langchain.prompts import PromptTemplate
 from langchain.chains import LLMChain
 import streamlit as st
-from typing import List, Dict, Tuple, Any
+from typing import List, Dict, Tuple, Any, Optional, Set, Callable
+from collections import OrderedDict
 import re
 
+from analysis_cache import AnalysisCache, content_hash
+from answer_scoring import AnswerPreScorer, format_provisional_evaluation
+from jd_matching import JobMatcher
+from pdf_ocr import needs_ocr, ocr_pages
+from docx_text import extract_docx
+from llm_cassette import Cassette, CassetteMissError
+from llm_resilience import ResilientCaller
+from llm_providers import LLMProvider, provider_from_env
+from llm_scheduler import CHAIN_PRIORITIES, PRIORITY_ANALYSIS
+from ner_server import NERClient, NER_MODEL_NAME, NER_SERVER_SOCKET
+from resume_sections import (
+    ResumeSegmenter, SectionIndex, pdf_heading_hints,
+    SUMMARY, EXPERIENCE, SKILLS
+)
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+NO_TEXT_MESSAGE = "No readable text found in the uploaded file."
+# Extracted documents kept per backend, so ATS and summary clicks do not re-run OCR
+DOCUMENT_MEMO_SIZE = 4
+
+
+class AnalysisCancelled(RuntimeError):
+    """Raised between analysis steps once the caller has asked to stop"""
+
+
 class CareerNavigatorBackend:
-    def __init__(self, groq_api_key: str):
+    def __init__(self, groq_api_key: str, cache: Optional[AnalysisCache] = None,
+                 cassette: Optional[Cassette] = None, resilience: Optional[ResilientCaller] = None,
+                 provider: Optional[LLMProvider] = None):
         """Initialize the Career Navigator with API key"""
         self.groq_api_key = groq_api_key
         self.llm = None
         self.chains = {}
         self.ner_model = None
+        self.cache = cache if cache is not None else AnalysisCache()
+        self.segmenter = ResumeSegmenter()
+        self.chain_sections = {}
+        self.job_matcher = None
+        self.answer_scorer = AnswerPreScorer()
+        self._documents: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.provider = provider if provider is not None else provider_from_env(groq_api_key)
+        self.cassette = cassette if cassette is not None else Cassette.from_env(self.provider.model)
+        # Shared with every other backend on the same endpoint, so one session's samples and
+        # failures inform the next instead of each session relearning them
+        self.resilience = resilience if resilience is not None else self.provider.resilience
+        # Overrides the per-chain priority class, e.g. PRIORITY_BATCH inside bulk workers
+        self.traffic_class: Optional[str] = None
         self._setup_llm()
         self._setup_chains()
         self._setup_ner_model()
@@ -28,11 +69,8 @@ class CareerNavigatorBackend:
     def _setup_llm(self):
         """Configure the LLM"""
         try:
-            self.llm = ChatGroq(
-                model_name="llama3-8b-8192",
-                temperature=0.3,
-                api_key=self.groq_api_key
-            )
+            self.llm = self.provider.build_llm()
+            logger.info(f"Using LLM provider {self.provider.describe()}")
         except Exception as e:
             logger.error(f"Failed to initialize LLM: {e}")
             raise
@@ -118,36 +156,106 @@ class CareerNavigatorBackend:
             'summarize': LLMChain(prompt=summarize_prompt, llm=self.llm)
         }
 
+        # Resume sections each chain reads; None means the whole resume. ATS feedback and
+        # the summary judge everything, certifications and awards included, so only role is trimmed
+        self.chain_sections = {
+            'role': [SUMMARY, EXPERIENCE, SKILLS],
+            'ats': None,
+            'summarize': None
+        }
+
     @st.cache_resource
     def _setup_ner_model(_self):
-        """Setup NER model for keyword extraction"""
+        """Setup NER model for keyword extraction, preferring the host's shared NER server"""
         try:
-            return pipeline("ner", model="dslim/bert-base-NER")
+            if NER_SERVER_SOCKET:
+                # The client loads the model itself while the server is down and switches back once it is up
+                client = NERClient(NER_SERVER_SOCKET, fallback=lambda: pipeline("ner", model=NER_MODEL_NAME))
+                if client.ping():
+                    logger.info(f"Using NER server at {NER_SERVER_SOCKET}")
+                else:
+                    logger.warning(f"NER server at {NER_SERVER_SOCKET} unavailable, will retry it")
+                return client
+            return pipeline("ner", model=NER_MODEL_NAME)
         except Exception as e:
             logger.error(f"Failed to load NER model: {e}")
             return None
 
-    def extract_text_from_file(self, uploaded_file) -> str:
-        """Extract text from uploaded file"""
+    def _chain_cache_key(self, name: str, inputs: Dict[str, str]) -> str:
+        """Cache key covering the provider and model, the chain's prompt template and its exact inputs"""
+        template = self.chains[name].prompt.template
+        return (f"chain:{name}:{self.provider.describe()}:{content_hash(template)}:"
+                f"{content_hash(json.dumps(inputs, sort_keys=True))}")
+
+    def _run_chain(self, name: str, inputs: Dict[str, str], use_cache: bool = False) -> str:
+        """Run a chain, reusing a stored completion for identical inputs when caching is enabled"""
+        # Cassette runs must see every prompt, so they bypass the result cache
+        use_cache = use_cache and self.cassette is None
+
+        if use_cache:
+            key = self._chain_cache_key(name, inputs)
+            cached = self.cache.get(key)
+            if cached is not None:
+                logger.info(f"Reusing cached '{name}' result")
+                return cached
+
+        chain = self.chains[name]
+        if self.cassette is not None and self.cassette.replaying:
+            return self.cassette.play(name, chain.prompt.format(**inputs)).strip()
+
+        priority = self.traffic_class or CHAIN_PRIORITIES.get(name, PRIORITY_ANALYSIS)
+        completion = self.resilience.call(
+            name, lambda cancelled: self.provider.call(lambda: chain.run(inputs), priority, cancelled))
+        if self.cassette is not None:
+            self.cassette.record(name, chain.prompt.format(**inputs), completion)
+        output = completion.strip()
+
+        if use_cache:
+            self.cache.set(key, output)
+        return output
+
+    def _extract_document(self, uploaded_file) -> Dict[str, Any]:
+        """Extract text plus any heading hints and OCR report, reusing the last few files' results"""
+        key = f"{uploaded_file.type}:{hashlib.sha256(uploaded_file.getvalue()).hexdigest()}"
+        document = self._documents.get(key)
+        if document is None:
+            document = self._read_document(uploaded_file)
+            self._documents[key] = document
+            if len(self._documents) > DOCUMENT_MEMO_SIZE:
+                self._documents.popitem(last=False)
+        else:
+            self._documents.move_to_end(key)
+        return document
+
+    def _read_document(self, uploaded_file) -> Dict[str, Any]:
+        """Extract text plus any heading hints and OCR report the file format can provide"""
         try:
             if uploaded_file.type == "application/pdf":
-                with open("temp.pdf", "wb") as f:
-                    f.write(uploaded_file.getvalue())
-                
-                doc = fitz.open("temp.pdf")
-                text = "\n".join([page.get_text() for page in doc])
+                pdf_bytes = uploaded_file.getvalue()
+                doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+                page_texts = [page.get_text() for page in doc]
+                heading_hints = pdf_heading_hints(doc)
                 doc.close()
-                os.remove("temp.pdf")
-                return text
+
+                # Only image-only pages take the expensive OCR path
+                scanned_pages = [i for i, page_text in enumerate(page_texts) if needs_ocr(page_text)]
+                ocr = ocr_pages(pdf_bytes, scanned_pages)
+                for i, page_text in ocr["texts"].items():
+                    page_texts[i] = page_text
+
+                return {
+                    "text": "\n".join(page_texts),
+                    "heading_hints": heading_hints,
+                    "ocr_report": ocr["report"] if scanned_pages else None
+                }
                 
             elif uploaded_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-                with open("temp.docx", "wb") as f:
-                    f.write(uploaded_file.getvalue())
-                
-                doc = docx.Document("temp.docx")
-                text = "\n".join([p.text for p in doc.paragraphs])
-                os.remove("temp.docx")
-                return text
+                extracted = extract_docx(io.BytesIO(uploaded_file.getvalue()))
+                return {
+                    "text": extracted["text"],
+                    "heading_hints": extracted["heading_hints"] or None,
+                    "ocr_report": None
+                }
                 
             else:
                 raise ValueError("Unsupported file format. Please upload PDF or DOCX files.")
@@ -156,7 +264,27 @@ class CareerNavigatorBackend:
             logger.error(f"Failed to extract text from file: {e}")
             raise
 
-    def extract_keywords(self, resume_text: str) -> List[str]:
+    def latency_report(self) -> Dict[str, Any]:
+        """LLM latency percentiles per chain, before and after deadlines/hedging"""
+        report = self.resilience.latency_report()
+        report["llm_provider"] = self.provider.describe()
+        report["scheduler"] = self.provider.scheduler.queue_depth()
+        return report
+
+    def extract_text_from_file(self, uploaded_file) -> str:
+        """Extract text from uploaded file"""
+        return self._extract_document(uploaded_file)["text"]
+
+    def segment_resume(self, resume_text: str, heading_hints: Optional[Set[str]] = None) -> SectionIndex:
+        """Index the resume's sections once so each chain can read only what it needs"""
+        return self.segmenter.segment(resume_text, heading_hints)
+
+    def _chain_input(self, name: str, resume_text: str, index: Optional[SectionIndex]) -> str:
+        if index is None:
+            index = self.segment_resume(resume_text)
+        return index.render(self.chain_sections.get(name))
+
+    def extract_keywords(self, resume_text: str, index: Optional[SectionIndex] = None) -> List[str]:
         """Extract keywords using NER model"""
         try:
             if self.ner_model is None:
@@ -165,38 +293,92 @@ class CareerNavigatorBackend:
             if self.ner_model is None:
                 return []
                 
-            entities = self.ner_model(resume_text)
-            keywords = list(set(ent["word"] for ent in entities if ent["entity"].startswith("B-")))
-            
+            if index is None:
+                index = self.segment_resume(resume_text)
+
+            # NER runs per section so a revised resume only re-tags the sections that changed
+            bodies = [index.body(section) for section in index.sections]
+            keys = [f"ner:{NER_MODEL_NAME}:{content_hash(body)}" for body in bodies]
+            section_words = [self.cache.get(key) for key in keys]
+            misses = [i for i, cached in enumerate(section_words) if cached is None]
+            if misses:
+                # One batched call for every changed section, which the NER server can micro-batch further
+                entities = self.ner_model([bodies[i] for i in misses])
+                for i, section_entities in zip(misses, entities):
+                    section_words[i] = [ent["word"] for ent in section_entities if ent["entity"].startswith("B-")]
+                    self.cache.set(keys[i], section_words[i])
+
+            words = [word for section in section_words for word in section]
+
+            keywords = list(dict.fromkeys(words))
             keywords = [kw.replace("##", "").strip() for kw in keywords if len(kw) > 2]
             return keywords[:20]  
         except Exception as e:
             logger.error(f"Failed to extract keywords: {e}")
             return []
 
-    def identify_role(self, resume_text: str) -> str:
+    def _get_job_matcher(self) -> JobMatcher:
+        """Lazily build the job catalog index from JOB_CATALOG_PATH (JSONL of id/text records)"""
+        if self.job_matcher is None:
+            self.job_matcher = JobMatcher()
+            catalog_path = os.getenv("JOB_CATALOG_PATH")
+            if catalog_path and os.path.exists(catalog_path):
+                self.job_matcher.load_job_descriptions(catalog_path)
+        return self.job_matcher
+
+    def match_jobs(self, resume_text: str, keywords: Optional[List[str]] = None,
+                   top_n: int = 10) -> List[Dict[str, Any]]:
+        """Rank catalog job descriptions for a resume"""
+        try:
+            return self._get_job_matcher().match_resume(resume_text, top_n, keywords)
+        except Exception as e:
+            logger.error(f"Failed to match jobs: {e}")
+            return []
+
+    def match_job_description(self, resume_text: str, job_description: str,
+                              keywords: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Compare a resume with a single job description"""
+        try:
+            matcher = JobMatcher()
+            matcher.add_job_descriptions([("target", job_description)])
+            return matcher.keyword_gap(resume_text, "target", keywords)
+        except Exception as e:
+            logger.error(f"Failed to match job description: {e}")
+            return {"coverage": 0.0, "overlapping_keywords": [], "missing_keywords": []}
+
+    def identify_role(self, resume_text: str, index: Optional[SectionIndex] = None) -> str:
         """Identify the most likely job role from resume"""
         try:
-            role = self.chains['role'].run({"resume": resume_text}).strip()
+            role = self._run_chain('role', {"resume": self._chain_input('role', resume_text, index)}, use_cache=True)
             return role
+        except CassetteMissError:
+            raise
         except Exception as e:
             logger.error(f"Failed to identify role: {e}")
             return "General Professional"
 
-    def get_ats_feedback(self, resume_text: str) -> str:
+    def get_ats_feedback(self, resume_text: str, index: Optional[SectionIndex] = None) -> str:
         """Get ATS feedback and scoring"""
+        if not resume_text.strip():
+            return NO_TEXT_MESSAGE
         try:
-            feedback = self.chains['ats'].run({"resume": resume_text}).strip()
+            feedback = self._run_chain('ats', {"resume": self._chain_input('ats', resume_text, index)}, use_cache=True)
             return feedback
+        except CassetteMissError:
+            raise
         except Exception as e:
             logger.error(f"Failed to get ATS feedback: {e}")
             return "Unable to generate ATS feedback at this time."
 
-    def summarize_resume(self, resume_text: str) -> str:
+    def summarize_resume(self, resume_text: str, index: Optional[SectionIndex] = None) -> str:
         """Generate resume summary"""
+        if not resume_text.strip():
+            return NO_TEXT_MESSAGE
         try:
-            summary = self.chains['summarize'].run({"resume": resume_text}).strip()
+            summary = self._run_chain('summarize', {"resume": self._chain_input('summarize', resume_text, index)}, use_cache=True)
             return summary
+        except CassetteMissError:
+            raise
         except Exception as e:
             logger.error(f"Failed to summarize resume: {e}")
             return "Unable to generate resume summary at this time."
@@ -204,34 +386,69 @@ class CareerNavigatorBackend:
     def generate_interview_question(self, role: str) -> str:
         """Generate interview question for specific role"""
         try:
-            question = self.chains['question'].run({"role": role}).strip()
+            question = self._run_chain('question', {"role": role})
             return question
+        except CassetteMissError:
+            raise
         except Exception as e:
             logger.error(f"Failed to generate interview question: {e}")
             return f"Tell me about your experience in {role}?"
 
-    def evaluate_answer(self, role: str, question: str, answer: str) -> str:
+    def pre_score_answer(self, role: str, question: str, answer: str,
+                         keywords: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Instant local score and rubric hints, shown until the LLM evaluation arrives"""
+        return self.answer_scorer.score(role, question, answer, keywords)
+
+    def evaluate_answer(self, role: str, question: str, answer: str,
+                        keywords: Optional[List[str]] = None) -> str:
         """Evaluate interview answer"""
         try:
-            evaluation = self.chains['evaluate'].run({
+            evaluation = self._run_chain('evaluate', {
                 "role": role,
                 "question": question,
                 "answer": answer
-            }).strip()
+            })
             return evaluation
+        except CassetteMissError:
+            raise
         except Exception as e:
             logger.error(f"Failed to evaluate answer: {e}")
-            return "Score: 5/10\nEvaluation: Unable to evaluate answer at this time."
+            return format_provisional_evaluation(
+                self.pre_score_answer(role, question, answer, keywords),
+                "AI evaluation is unavailable, so this is an automated estimate."
+            )
+
+    def analyze_resume(self, uploaded_file,
+                       should_cancel: Optional[Callable[[], bool]] = None) -> Dict[str, Any]:
+        """Complete resume analysis pipeline.
+
+        should_cancel is checked before each step; when it returns True the
+        remaining steps (and their LLM calls) are skipped and AnalysisCancelled is raised.
+        """
+        def checkpoint(step: str):
+            if should_cancel is not None and should_cancel():
+                raise AnalysisCancelled(f"Analysis cancelled before {step}")
 
-    def analyze_resume(self, uploaded_file) -> Dict[str, Any]:
-        """Complete resume analysis pipeline"""
         try:
-            resume_text = self.extract_text_from_file(uploaded_file)
+            checkpoint("text extraction")
+            document = self._extract_document(uploaded_file)
+            resume_text = document["text"]
+            if not resume_text.strip():
+                raise ValueError(NO_TEXT_MESSAGE)
+            index = self.segment_resume(resume_text, document["heading_hints"])
             
-            role = self.identify_role(resume_text)
-            ats_feedback = self.get_ats_feedback(resume_text)
-            summary = self.summarize_resume(resume_text)
-            keywords = self.extract_keywords(resume_text)
+            reused = [name for name in ('role', 'ats', 'summarize')
+                      if self.cache.get(self._chain_cache_key(
+                          name, {"resume": self._chain_input(name, resume_text, index)})) is not None]
+            
+            checkpoint("role identification")
+            role = self.identify_role(resume_text, index)
+            checkpoint("ATS feedback")
+            ats_feedback = self.get_ats_feedback(resume_text, index)
+            checkpoint("summary")
+            summary = self.summarize_resume(resume_text, index)
+            checkpoint("keyword extraction")
+            keywords = self.extract_keywords(resume_text, index)
             
             return {
                 "resume_text": resume_text,
@@ -239,9 +456,15 @@ class CareerNavigatorBackend:
                 "ats_feedback": ats_feedback,
                 "summary": summary,
                 "keywords": keywords,
+                "sections": index.to_dict(),
+                "section_hashes": index.section_hashes(),
+                "reused_artifacts": reused,
+                "ocr_report": document["ocr_report"],
                 "success": True
             }
             
+        except (CassetteMissError, AnalysisCancelled):
+            raise
         except Exception as e:
             logger.error(f"Failed to analyze resume: {e}")
             return {
@@ -257,6 +480,8 @@ class CareerNavigatorBackend:
                 "question": question,
                 "success": True
             }
+        except CassetteMissError:
+            raise
         except Exception as e:
             logger.error(f"Failed to conduct interview: {e}")
             return {
@@ -0,0 +1,120 @@
+"""Build time, query latency and memory of EmbeddingIndex at 10k/100k resumes.
+
+Vectors are synthetic unit vectors drawn around topic centroids, so the
+numbers isolate index cost from embedding cost; embedder throughput is
+measured separately. Pass --clusters 0 for structureless random vectors,
+which is the worst case for IVF recall.
+
+    python benchmarks/bench_embedding_index.py --sizes 10000 100000
+"""
+import os
+import sys
+import time
+import argparse
+import resource
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from embedding_index import EmbeddingIndex, HashingEmbedder, load_embedder
+
+
+def current_rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def synthetic_vectors(rng, n: int, dim: int, centers) -> np.ndarray:
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    if centers is not None:
+        vectors = centers[rng.integers(0, centers.shape[0], n)] * 4.0 + vectors / np.sqrt(dim) * 8.0
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def time_queries(fn, queries: np.ndarray, batch: int) -> float:
+    """Mean milliseconds per query when queries are issued in batches"""
+    start = time.perf_counter()
+    for i in range(0, queries.shape[0], batch):
+        fn(queries[i:i + batch])
+    return (time.perf_counter() - start) * 1000 / queries.shape[0]
+
+
+def bench_index(size: int, dim: int, dtype: str, num_queries: int, k: int, nprobe: int,
+                clusters: int, workdir: str):
+    rng = np.random.default_rng(0)
+    centers = synthetic_vectors(rng, clusters, dim, None) if clusters else None
+    path = os.path.join(workdir, f"bench_{dtype}_{size}")
+    index = EmbeddingIndex(path, dim, dtype)
+
+    rss_before = current_rss_mb()
+    start = time.perf_counter()
+    for offset in range(0, size, 10000):
+        n = min(10000, size - offset)
+        index.add([f"resume-{offset + i}" for i in range(n)], synthetic_vectors(rng, n, dim, centers))
+    index.flush()
+    build_s = time.perf_counter() - start
+    file_mb = os.path.getsize(f"{path}.vec") / 2**20
+
+    queries = synthetic_vectors(rng, num_queries, dim, centers)
+    exact_1 = time_queries(lambda q: index.search_exact(q, k), queries, 1)
+    exact_32 = time_queries(lambda q: index.search_exact(q, k), queries, 32)
+    _, exact_rows = index.search_exact(queries, k)
+
+    start = time.perf_counter()
+    ivf = index.build_ivf()
+    ivf_build_s = time.perf_counter() - start
+    ivf_1 = time_queries(lambda q: ivf.search(index, q, k, nprobe), queries, 1)
+    _, ivf_rows = ivf.search(index, queries, k, nprobe)
+    recall = np.mean([len(set(a) & set(b)) / k for a, b in zip(exact_rows, ivf_rows)])
+
+    print(f"{size:>8} {dtype:>7} {build_s:>8.2f} {file_mb:>8.1f} {exact_1:>9.2f} {exact_32:>9.2f} "
+          f"{ivf_build_s:>8.2f} {ivf_1:>8.2f} {recall:>7.3f} {current_rss_mb() - rss_before:>8.1f} "
+          f"{peak_rss_mb():>8.1f}")
+
+
+def bench_embedder(model_name: str, count: int = 256):
+    embedder = HashingEmbedder() if model_name == "hashing" else load_embedder(model_name)
+    texts = [
+        "Senior software engineer with 7 years of Python, Django and AWS experience. "
+        "Led migration of a monolith to microservices and mentored a team of five. " * 4
+    ] * count
+    embedder.embed(texts[:8])
+    start = time.perf_counter()
+    embedder.embed(texts)
+    elapsed = time.perf_counter() - start
+    print(f"Embedder {type(embedder).__name__}: {count / elapsed:.1f} resumes/s on CPU")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--dtypes", nargs="+", default=["float32", "int8"])
+    parser.add_argument("--queries", type=int, default=64)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, default=8)
+    parser.add_argument("--clusters", type=int, default=256)
+    parser.add_argument("--embedder", default="hashing", help="'hashing' or a transformers model name")
+    args = parser.parse_args()
+
+    bench_embedder(args.embedder)
+    print()
+    print(f"{'resumes':>8} {'dtype':>7} {'build_s':>8} {'file_mb':>8} {'exact_ms':>9} {'exact32':>9} "
+          f"{'ivf_s':>8} {'ivf_ms':>8} {'recall':>7} {'rss_mb':>8} {'peak_mb':>8}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            for dtype in args.dtypes:
+                bench_index(size, args.dim, dtype, args.queries, args.k, args.nprobe, args.clusters, workdir)
+
+
+if __name__ == "__main__":
+    main()
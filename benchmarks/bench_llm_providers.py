@@ -0,0 +1,130 @@
+"""Latency and throughput of each LLM provider on the same chain prompts.
+
+Every provider runs the backend's real role, ATS, summary, question and
+evaluation prompts for one sample resume, through the same deadline and
+per-provider concurrency limits the app uses. Configure providers with the
+usual env vars (GROQ_API_KEY, LOCAL_LLM_BASE_URL, LOCAL_LLM_MODEL, ...).
+
+    python benchmarks/bench_llm_providers.py --providers groq local --concurrency 1 4 --rounds 3
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend import CareerNavigatorBackend
+from analysis_cache import AnalysisCache
+from llm_providers import provider_from_env
+
+SAMPLE_RESUME = """Jordan Candidate
+jordan@example.com
+
+SUMMARY
+Backend engineer with 6 years of Python, AWS and Kubernetes.
+
+EXPERIENCE
+Senior Engineer, Acme Corp (2020-2024)
+- Cut API p99 latency by 40% by moving hot paths to async workers
+- Led migration of 30 services to Kubernetes
+
+EDUCATION
+BSc Computer Science, State University
+
+SKILLS
+Python, Go, PostgreSQL, Docker, Terraform
+"""
+ROLE = "Backend Engineer"
+QUESTION = "How would you design a rate limiter for a public API?"
+ANSWER = "I used a token bucket per API key stored in Redis, with a sliding window fallback."
+
+
+class BenchBackend(CareerNavigatorBackend):
+    """The real chains without loading the NER model, which no prompt here needs"""
+
+    def _setup_ner_model(self):
+        return None
+
+
+def chain_workload(backend: CareerNavigatorBackend) -> List[tuple]:
+    index = backend.segment_resume(SAMPLE_RESUME)
+    return [
+        ("role", {"resume": backend._chain_input("role", SAMPLE_RESUME, index)}),
+        ("ats", {"resume": backend._chain_input("ats", SAMPLE_RESUME, index)}),
+        ("summarize", {"resume": backend._chain_input("summarize", SAMPLE_RESUME, index)}),
+        ("question", {"role": ROLE}),
+        ("evaluate", {"role": ROLE, "question": QUESTION, "answer": ANSWER})
+    ]
+
+
+def run(provider_name: str, concurrency: int, rounds: int, workdir: str) -> Dict[str, Any]:
+    provider = provider_from_env(os.getenv("GROQ_API_KEY", ""), provider_name)
+    backend = BenchBackend(provider.name, cache=AnalysisCache(os.path.join(workdir, "bench_cache.db")),
+                           provider=provider)
+    workload = chain_workload(backend) * rounds
+    latencies: Dict[str, List[float]] = {}
+    output_chars = 0
+    errors = 0
+
+    def one(item):
+        nonlocal output_chars, errors
+        name, inputs = item
+        start = time.perf_counter()
+        try:
+            output = backend._run_chain(name, inputs)
+        except Exception as e:
+            errors += 1
+            print(f"  {provider_name} '{name}' failed: {e}")
+            return
+        latencies.setdefault(name, []).append(time.perf_counter() - start)
+        output_chars += len(output)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, workload))
+    elapsed = time.perf_counter() - start
+
+    completed = sum(len(v) for v in latencies.values())
+    return {
+        "provider": provider.describe(),
+        "max_concurrency": provider.max_concurrency,
+        "latencies": latencies,
+        "calls_per_s": completed / elapsed,
+        "chars_per_s": output_chars / elapsed,
+        "errors": errors
+    }
+
+
+def print_report(result: Dict[str, Any], concurrency: int):
+    print(f"\n=== {result['provider']} (client concurrency {concurrency}, "
+          f"provider slots {result['max_concurrency']}): {result['calls_per_s']:.2f} calls/s, "
+          f"{result['chars_per_s']:.0f} output chars/s, {result['errors']} errors")
+    print(f"  {'chain':<10} {'n':>4} {'p50_s':>8} {'p95_s':>8}")
+    for name, values in result["latencies"].items():
+        p50, p95 = np.percentile(values, [50, 95])
+        print(f"  {name:<10} {len(values):>4} {p50:>8.2f} {p95:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--providers", nargs="+", default=["groq", "local"])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--rounds", type=int, default=3, help="repetitions of the 5-prompt workload")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for provider_name in args.providers:
+            if provider_name == "groq" and not os.getenv("GROQ_API_KEY"):
+                print("Skipping groq: GROQ_API_KEY is not set")
+                continue
+            for concurrency in args.concurrency:
+                print_report(run(provider_name, concurrency, args.rounds, workdir), concurrency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Interactive latency and batch throughput with and without the priority scheduler.
+
+A simulated provider with a fixed number of slots serves a continuous
+batch flood alongside paced interactive interview and analysis calls.
+"fifo" hands out slots first come, first served (the old semaphore);
+"wfq" uses PriorityScheduler. Reported per class: time waiting for a slot
+(p50/p95/p99) and completed calls per second.
+
+    python benchmarks/bench_llm_scheduler.py --slots 4 --duration 10
+"""
+import os
+import sys
+import time
+import argparse
+import threading
+import numpy as np
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_scheduler import PriorityScheduler, PRIORITY_INTERVIEW, PRIORITY_ANALYSIS, PRIORITY_BATCH
+
+
+class FifoSlots:
+    """Previous behaviour: one shared semaphore, no notion of priority"""
+
+    def __init__(self, slots: int):
+        self._slots = threading.Semaphore(slots)
+
+    def call(self, priority, fn):
+        with self._slots:
+            return fn()
+
+
+def run(mode: str, args) -> Dict[str, Dict[str, float]]:
+    scheduler = PriorityScheduler(args.slots) if mode == "wfq" else FifoSlots(args.slots)
+    rng = np.random.default_rng(0)
+    rng_lock = threading.Lock()
+    waits: Dict[str, List[float]] = {}
+    completed: Dict[str, int] = {}
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + args.duration
+
+    def llm_call():
+        with rng_lock:
+            latency = rng.lognormal(np.log(args.latency), 0.3)
+        time.sleep(latency)
+
+    def timed(priority: str):
+        submitted = time.perf_counter()
+        started = []
+
+        def fn():
+            started.append(time.perf_counter())
+            llm_call()
+
+        scheduler.call(priority, fn)
+        with lock:
+            waits.setdefault(priority, []).append(started[0] - submitted)
+            completed[priority] = completed.get(priority, 0) + 1
+
+    def batch_worker():
+        while time.perf_counter() < stop_at:
+            timed(PRIORITY_BATCH)
+
+    def interactive_user(priority: str, think_time: float):
+        while time.perf_counter() < stop_at:
+            timed(priority)
+            time.sleep(think_time)
+
+    threads = [threading.Thread(target=batch_worker) for _ in range(args.batch_workers)]
+    threads += [threading.Thread(target=interactive_user, args=(PRIORITY_INTERVIEW, args.think_time))
+                for _ in range(args.interview_users)]
+    threads += [threading.Thread(target=interactive_user, args=(PRIORITY_ANALYSIS, args.think_time))
+                for _ in range(args.analysis_users)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    return {
+        priority: {
+            "p50": float(np.percentile(values, 50)),
+            "p95": float(np.percentile(values, 95)),
+            "p99": float(np.percentile(values, 99)),
+            "per_s": completed[priority] / elapsed
+        }
+        for priority, values in waits.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--slots", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per mode")
+    parser.add_argument("--latency", type=float, default=0.1, help="median LLM latency in seconds")
+    parser.add_argument("--batch-workers", type=int, default=16)
+    parser.add_argument("--interview-users", type=int, default=3)
+    parser.add_argument("--analysis-users", type=int, default=2)
+    parser.add_argument("--think-time", type=float, default=0.3, help="pause between a user's calls")
+    args = parser.parse_args()
+
+    for mode in ("fifo", "wfq"):
+        results = run(mode, args)
+        print(f"\n=== {mode}: {args.slots} slots, {args.batch_workers} batch workers, "
+              f"{args.interview_users} interview + {args.analysis_users} analysis users")
+        print(f"  {'class':<22} {'wait p50':>9} {'wait p95':>9} {'wait p99':>9} {'calls/s':>8}")
+        for priority in (PRIORITY_INTERVIEW, PRIORITY_ANALYSIS, PRIORITY_BATCH):
+            if priority not in results:
+                continue
+            stats = results[priority]
+            print(f"  {priority:<22} {stats['p50'] * 1000:7.0f}ms {stats['p95'] * 1000:7.0f}ms "
+                  f"{stats['p99'] * 1000:7.0f}ms {stats['per_s']:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""Concurrent-session load test of frontend.py using Streamlit's AppTest.
+
+Each virtual user drives the real main() page flows: upload, analyze, ATS,
+summary, and a 5-question interview. A fake LLM with configurable latency
+replaces Groq, and a stub NER model replaces the transformer. Jobs run
+inline (JOB_QUEUE_WORKERS=0) so each step's latency is what a user waits
+in the script thread.
+
+ATS and summary run after the analysis, so by default they are served
+from its cached chain results, as they are in the app; they are reported
+as "ats (cached)" and "summary (cached)". --cold-cache gives each of
+those steps an empty cache instead, so they pay for extraction and the
+LLM call again.
+
+    python benchmarks/load_test_streamlit.py --users 1 4 16 --llm-latency 0.5
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import contextlib
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+# Analysis runs inline, so the job queue database is never opened
+os.environ["JOB_QUEUE_WORKERS"] = "0"
+os.environ["LOAD_TEST_FRONTEND"] = os.path.join(REPO_ROOT, "frontend.py")
+
+import fitz
+from unittest.mock import MagicMock
+from langchain_core.language_models.llms import LLM
+from streamlit import config
+from streamlit.runtime import Runtime
+from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.testing.v1 import AppTest, app_test
+from streamlit.testing.v1.util import build_mock_config_get_option
+
+from backend import CareerNavigatorBackend
+from analysis_cache import AnalysisCache
+from job_queue import StoredUpload
+
+ANALYSIS_PAGE = "📄 Resume Analysis"
+ATS_PAGE = "🎯 ATS Feedback"
+SUMMARY_PAGE = "📝 Resume Summary"
+INTERVIEW_PAGE = "🎤 Interview Simulation"
+INTERVIEW_QUESTIONS = 5
+
+
+class FakeLatencyLLM(LLM):
+    """Canned completions after a normally distributed delay"""
+
+    latency: float = 0.5
+    jitter: float = 0.2
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-latency"
+
+    def _call(self, prompt: str, stop=None, run_manager=None, **kwargs) -> str:
+        time.sleep(max(0.0, random.gauss(self.latency, self.jitter * self.latency)))
+        if "ATS" in prompt:
+            return ("ATS Score: 72/100\nStrengths: Clear structure\n"
+                    "Areas for Improvement: Quantify impact\nRecommendations: Add metrics")
+        if "Evaluate this interview answer" in prompt:
+            return "Score: 7/10\nEvaluation: Solid answer, add a concrete example."
+        if "interview question" in prompt:
+            return "How would you design a rate limiter for a public API?"
+        if "professional summary" in prompt:
+            return "Backend engineer with 6 years of Python and cloud experience."
+        return "Software Engineer"
+
+
+def _stub_ner(texts: List[str], **kwargs) -> List[List[Dict[str, Any]]]:
+    return [[{"word": word, "entity": "B-MISC"} for word in text.split() if word[:1].isupper()] for text in texts]
+
+
+class LoadTestBackend(CareerNavigatorBackend):
+    """Real backend pipeline with the Groq LLM and NER model swapped for fakes"""
+
+    def __init__(self, latency: float, jitter: float, cache: AnalysisCache):
+        self._latency = latency
+        self._jitter = jitter
+        super().__init__("load-test", cache=cache)
+
+    def _setup_llm(self):
+        self.llm = FakeLatencyLLM(latency=self._latency, jitter=self._jitter)
+
+    def _setup_ner_model(self):
+        return _stub_ner
+
+
+def make_resume(session_id: int) -> StoredUpload:
+    """One-page PDF resume, unique per session so no session reuses another's cached results"""
+    text = (
+        f"Jordan Candidate {session_id}\njordan{session_id}@example.com\n\n"
+        "SUMMARY\nBackend engineer with 6 years of Python, AWS and Kubernetes.\n\n"
+        "EXPERIENCE\nSenior Engineer, Acme Corp (2020-2024)\n- Cut API latency by 40%\n"
+        f"- Led migration of {session_id} services to Kubernetes\n\n"
+        "EDUCATION\nBSc Computer Science, State University\n\n"
+        "SKILLS\nPython, Go, PostgreSQL, Docker, Terraform\n"
+    )
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 72), text, fontsize=10)
+    data = doc.tobytes()
+    doc.close()
+    return StoredUpload(f"resume_{session_id}.pdf", "application/pdf", data)
+
+
+class _IgnoreRuntimeSwaps:
+    """Replaces Runtime inside app_test so a finishing session cannot clear the shared runtime"""
+
+    def __setattr__(self, name, value):
+        pass
+
+
+def install_shared_runtime():
+    """One runtime for every session, as in a real server process.
+
+    AppTest normally installs and tears down a global mock runtime and
+    config patch around each script run, which breaks as soon as two
+    sessions run concurrently. Here both are installed once (shared
+    cache_resource storage included) and AppTest's per-run swaps become
+    no-ops.
+    """
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime._instance = runtime
+    app_test.Runtime = _IgnoreRuntimeSwaps()
+
+    config.get_option = build_mock_config_get_option({"global.appTest": True})
+    app_test.patch_config_options = lambda overrides: contextlib.nullcontext()
+
+
+# Runs inside AppTest: serve the preset upload, then execute the real frontend.
+# AppTest cannot drive st.file_uploader, so it hands back the session's preset upload.
+APP_SCRIPT = """
+import os
+import sys
+import runpy
+import streamlit as st
+
+frontend_path = os.environ["LOAD_TEST_FRONTEND"]
+sys.path.insert(0, os.path.dirname(frontend_path))
+st.file_uploader = lambda *args, **kwargs: st.session_state.get("_load_test_upload")
+runpy.run_path(frontend_path, run_name="__main__")
+"""
+
+
+def write_app_script(workdir: str) -> str:
+    """Written once up front; AppTest.from_function rewrites a shared temp file per session,
+    which races when sessions start concurrently"""
+    path = os.path.join(workdir, "load_test_app.py")
+    with open(path, "w") as f:
+        f.write(APP_SCRIPT)
+    return path
+
+
+class Session:
+    """One scripted user walking through every page"""
+
+    def __init__(self, session_id: int, script_path: str, backend: CareerNavigatorBackend, timeout: float,
+                 cold_cache_dir: Optional[str] = None):
+        self.session_id = session_id
+        self.backend = backend
+        self.cold_cache_dir = cold_cache_dir
+        self.timings: Dict[str, List[float]] = {}
+        self.at = AppTest.from_file(script_path, default_timeout=timeout)
+        self.at.session_state["backend"] = backend
+        self.at.session_state["_load_test_upload"] = make_resume(session_id)
+
+    def _step(self, name: str, action):
+        start = time.perf_counter()
+        action()
+        self.timings.setdefault(name, []).append(time.perf_counter() - start)
+        if self.at.exception:
+            raise RuntimeError(f"{name} failed: {self.at.exception[0].value}")
+
+    def _goto(self, page: str):
+        self.at.sidebar.radio[0].set_value(page).run()
+
+    def _after_analysis_step(self, name: str, action):
+        """ATS/summary step: a cache hit on the analysis results, or a cold run with --cold-cache"""
+        if self.cold_cache_dir is None:
+            self._step(f"{name} (cached)", action)
+            return
+        warm_cache = self.backend.cache
+        self.backend.cache = AnalysisCache(os.path.join(self.cold_cache_dir, f"cold_{self.session_id}_{name}.db"))
+        self.backend._documents.clear()
+        try:
+            self._step(name, action)
+        finally:
+            self.backend.cache = warm_cache
+
+    def run(self):
+        at = self.at
+        self._step("load", lambda: at.run())
+        self._step("login", lambda: at.sidebar.text_input[0].input("load-test").run())
+
+        self._goto(ANALYSIS_PAGE)
+        self._step("analyze", lambda: at.button(key="analyze_btn").click().run())
+
+        self._goto(ATS_PAGE)
+        self._after_analysis_step("ats", lambda: at.button(key="ats_btn").click().run())
+
+        self._goto(SUMMARY_PAGE)
+        self._after_analysis_step("summary", lambda: at.button(key="summary_btn").click().run())
+
+        self._goto(INTERVIEW_PAGE)
+        self._step("start_interview", lambda: at.button(key="start_interview").click().run())
+        for i in range(INTERVIEW_QUESTIONS):
+            self._step("question", lambda: at.button(key="new_question").click().run())
+            at.text_area(key=f"answer_{i}").input(
+                "I used a token bucket per API key stored in Redis, with a sliding window fallback."
+            )
+            self._step("evaluate", lambda: at.button(key=f"submit_{i}").click().run())
+
+
+class RssSampler:
+    """Tracks peak resident memory of this process while a load level runs"""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stop.is_set():
+            with open("/proc/self/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        self.peak_mb = max(self.peak_mb, int(line.split()[1]) / 1024)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_level(users: int, sessions_per_user: int, latency: float, jitter: float,
+              timeout: float, workdir: str, first_session: int, cold_cache: bool = False) -> Dict[str, Any]:
+    cache = AnalysisCache(os.path.join(workdir, f"cache_{users}.db"))
+    script_path = write_app_script(workdir)
+    # One backend per simulated user, as each browser session builds its own
+    backends = [LoadTestBackend(latency, jitter, cache) for _ in range(users)]
+    timings: Dict[str, List[float]] = {}
+    errors: List[str] = []
+    lock = threading.Lock()
+
+    def user(u: int):
+        for s in range(sessions_per_user):
+            session = Session(first_session + u * sessions_per_user + s, script_path, backends[u], timeout,
+                              workdir if cold_cache else None)
+            try:
+                session.run()
+            except Exception as e:
+                with lock:
+                    errors.append(str(e))
+            with lock:
+                for step, values in session.timings.items():
+                    timings.setdefault(step, []).extend(values)
+
+    with RssSampler() as rss:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=users) as pool:
+            list(pool.map(user, range(users)))
+        elapsed = time.perf_counter() - start
+
+    completed = users * sessions_per_user - len(errors)
+    return {
+        "users": users,
+        "elapsed": elapsed,
+        "sessions_per_min": completed / elapsed * 60,
+        "steps_per_s": sum(len(v) for v in timings.values()) / elapsed,
+        "timings": timings,
+        "errors": errors,
+        "peak_rss_mb": rss.peak_mb
+    }
+
+
+def print_report(result: Dict[str, Any]):
+    print(f"\n=== {result['users']} concurrent users: {result['sessions_per_min']:.1f} sessions/min, "
+          f"{result['steps_per_s']:.2f} steps/s, peak RSS {result['peak_rss_mb']:.0f} MB, "
+          f"{len(result['errors'])} errors")
+    print(f"  {'step':<16} {'n':>5} {'p50_s':>8} {'p95_s':>8} {'p99_s':>8}")
+    for step, values in result["timings"].items():
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        print(f"  {step:<16} {len(values):>5} {p50:>8.2f} {p95:>8.2f} {p99:>8.2f}")
+    for error in result["errors"][:3]:
+        print(f"  error: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--sessions-per-user", type=int, default=1)
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="mean fake LLM latency in seconds")
+    parser.add_argument("--llm-jitter", type=float, default=0.2, help="latency std-dev as a fraction of the mean")
+    parser.add_argument("--step-timeout", type=float, default=120.0)
+    parser.add_argument("--cold-cache", action="store_true",
+                        help="run ATS and summary against an empty cache instead of the analysis results")
+    args = parser.parse_args()
+
+    install_shared_runtime()
+    with tempfile.TemporaryDirectory() as workdir:
+        first_session = 0
+        for users in args.users:
+            result = run_level(users, args.sessions_per_user, args.llm_latency, args.llm_jitter,
+                               args.step_timeout, workdir, first_session, args.cold_cache)
+            first_session += users * args.sessions_per_user
+            print_report(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import re
+import zipfile
+import logging
+import xml.etree.ElementTree as ET
+from typing import List, Dict, Set, Any, IO, Iterator
+
+logger = logging.getLogger(__name__)
+
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+MC_NS = "{http://schemas.openxmlformats.org/markup-compatibility/2006}"
+
+DOCUMENT_PART = "word/document.xml"
+HEADER_PART_RE = re.compile(r"word/header\d*\.xml$")
+FOOTER_PART_RE = re.compile(r"word/footer\d*\.xml$")
+
+P = W_NS + "p"
+T = W_NS + "t"
+TAB = W_NS + "tab"
+BREAKS = (W_NS + "br", W_NS + "cr")
+HYPHEN = W_NS + "noBreakHyphen"
+P_STYLE = W_NS + "pStyle"
+STYLE_VAL = W_NS + "val"
+FALLBACK = MC_NS + "Fallback"
+
+# Style ids of top-level headings: "Heading1" in Word, "Heading 1" in some other writers.
+# Templates often style job titles as Heading 2, so lower levels are not section hints.
+TOP_HEADING_STYLE_RE = re.compile(r"^(heading\s*1|title)$", re.IGNORECASE)
+
+
+def _part_number(name: str) -> int:
+    digits = re.findall(r"\d+", name.rsplit("/", 1)[-1])
+    return int(digits[0]) if digits else 0
+
+
+def _stream_paragraphs(stream: IO[bytes]) -> Iterator[Dict[str, Any]]:
+    """Paragraph texts and styles of one WordprocessingML part, in document order.
+
+    Text boxes hold their own paragraphs nested inside a run of the outer
+    paragraph, so paragraphs are tracked on a stack. Office writes every
+    text box twice, as DrawingML in mc:Choice and as VML in mc:Fallback;
+    the fallback copy is skipped. Table cells are ordinary paragraphs, read
+    row by row. Deleted text (w:delText) and field codes are never w:t, so
+    they drop out.
+    """
+    stack: List[Dict[str, Any]] = []
+    path: List[ET.Element] = []
+    fallback_depth = 0
+
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            path.append(elem)
+        else:
+            path.pop()
+            # Everything needed from a finished element has been read; detaching it keeps memory flat
+            if path:
+                path[-1].remove(elem)
+
+        if tag == FALLBACK:
+            fallback_depth += 1 if event == "start" else -1
+            continue
+        if fallback_depth:
+            continue
+
+        if event == "start":
+            if tag == P:
+                stack.append({"parts": [], "style": None})
+            continue
+
+        if not stack:
+            continue
+        current = stack[-1]
+        if tag == T:
+            current["parts"].append(elem.text or "")
+        elif tag == TAB:
+            current["parts"].append("\t")
+        elif tag in BREAKS:
+            current["parts"].append("\n")
+        elif tag == HYPHEN:
+            current["parts"].append("-")
+        elif tag == P_STYLE:
+            current["style"] = elem.get(STYLE_VAL)
+        elif tag == P:
+            stack.pop()
+            text = "".join(current["parts"]).strip()
+            if text:
+                yield {"text": text, "style": current["style"]}
+
+
+def extract_docx(data: IO[bytes]) -> Dict[str, Any]:
+    """Text of a DOCX in reading order: headers, body (tables and text boxes included), footers.
+
+    Streams each XML part straight out of the zip instead of building a
+    full object model. Paragraphs in top-level heading styles are returned as
+    heading hints for the resume segmenter. Header and footer paragraphs
+    repeated across first-page/even/default variants are kept once.
+    """
+    with zipfile.ZipFile(data) as archive:
+        names = archive.namelist()
+        if DOCUMENT_PART not in names:
+            raise ValueError("Not a Word document: word/document.xml is missing")
+
+        headers = sorted((n for n in names if HEADER_PART_RE.match(n)), key=_part_number)
+        footers = sorted((n for n in names if FOOTER_PART_RE.match(n)), key=_part_number)
+
+        lines: List[str] = []
+        heading_hints: Set[str] = set()
+        seen_margin_text: Set[str] = set()
+
+        for part in headers + [DOCUMENT_PART] + footers:
+            is_margin = part != DOCUMENT_PART
+            with archive.open(part) as stream:
+                for paragraph in _stream_paragraphs(stream):
+                    text = paragraph["text"]
+                    if is_margin:
+                        if text in seen_margin_text:
+                            continue
+                        seen_margin_text.add(text)
+                    style = paragraph["style"] or ""
+                    if not is_margin and TOP_HEADING_STYLE_RE.match(style):
+                        heading_hints.add(text)
+                    lines.append(text)
+
+    return {"text": "\n".join(lines), "heading_hints": heading_hints}
@@ -0,0 +1,426 @@
+import os
+import re
+import json
+import zlib
+import fcntl
+import logging
+import numpy as np
+from typing import List, Dict, Tuple, Any, Optional, Iterable
+
+from analysis_cache import content_hash
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+# Where every analyzed resume is indexed for candidate search; unset (the default) disables indexing
+CANDIDATE_INDEX_PATH = os.getenv("CANDIDATE_INDEX_PATH", "")
+SEARCH_CHUNK_ROWS = 65536
+
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#.\-]*")
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+class HashingEmbedder:
+    """Model-free embedder using signed feature hashing of words and word bigrams.
+
+    Used when no sentence-transformer model can be loaded; quality is lexical
+    rather than semantic, but it costs microseconds per resume.
+    """
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = _WORD_RE.findall(text.lower())
+            features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+            for feature in features:
+                h = zlib.crc32(feature.encode("utf-8"))
+                vectors[row, h % self.dim] += 1.0 if (h >> 31) & 1 else -1.0
+        return _normalize_rows(vectors)
+
+
+class SentenceEmbedder:
+    """Mean-pooled sentence embeddings from a small transformer, run on CPU in batches"""
+
+    def __init__(self, model_name: str = DEFAULT_EMBEDDING_MODEL, batch_size: int = 32, max_length: int = 256):
+        from transformers import AutoTokenizer, AutoModel
+
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModel.from_pretrained(model_name)
+        self.model.eval()
+        self.dim = self.model.config.hidden_size
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        import torch
+
+        batches = []
+        with torch.inference_mode():
+            for start in range(0, len(texts), self.batch_size):
+                encoded = self.tokenizer(
+                    texts[start:start + self.batch_size],
+                    padding=True,
+                    truncation=True,
+                    max_length=self.max_length,
+                    return_tensors="pt"
+                )
+                hidden = self.model(**encoded).last_hidden_state
+                mask = encoded["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+                pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+                batches.append(pooled.numpy())
+        if not batches:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return _normalize_rows(np.concatenate(batches))
+
+
+def load_embedder(model_name: str = DEFAULT_EMBEDDING_MODEL):
+    """Sentence embedder if the model can be loaded, hashing embedder otherwise"""
+    if model_name == "hashing":
+        return HashingEmbedder()
+    try:
+        return SentenceEmbedder(model_name)
+    except Exception as e:
+        logger.error(f"Failed to load embedding model {model_name}, using hashing embedder: {e}")
+        return HashingEmbedder()
+
+
+def _merge_top_k(best_scores: np.ndarray, best_rows: np.ndarray,
+                 scores: np.ndarray, rows: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Merge a block of (queries x candidates) scores into the running per-query top-k"""
+    all_scores = np.concatenate([best_scores, scores], axis=1)
+    all_rows = np.concatenate([best_rows, np.broadcast_to(rows, scores.shape)], axis=1)
+    keep = min(k, all_scores.shape[1])
+    part = np.argpartition(-all_scores, keep - 1, axis=1)[:, :keep]
+    return np.take_along_axis(all_scores, part, axis=1), np.take_along_axis(all_rows, part, axis=1)
+
+
+class EmbeddingIndex:
+    """Append-only, memory-mapped matrix of unit vectors with an ID sidecar.
+
+    Files: <path>.vec (float32 or int8 rows), <path>.scale (per-row float32
+    dequantization scale, int8 only), <path>.ids (one JSON id per line) and
+    <path>.meta.json. Vectors are searched by inner product, which is cosine
+    similarity for the normalized vectors the embedders produce.
+    """
+
+    def __init__(self, path: str, dim: int, dtype: str = "float32"):
+        if dtype not in ("float32", "int8"):
+            raise ValueError(f"Unsupported index dtype: {dtype}")
+        self.path = path
+        self.dim = dim
+        self.dtype = dtype
+        self.ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self.capacity = 0
+        self._vectors = None
+        self._scales = None
+        self.ivf: Optional["IVFIndex"] = None
+        self._ivf_dirty = False
+
+        if os.path.exists(self._meta_path):
+            self._load()
+
+    @property
+    def _meta_path(self) -> str:
+        return f"{self.path}.meta.json"
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _load(self):
+        with open(self._meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.dim = meta["dim"]
+        self.dtype = meta["dtype"]
+        self.capacity = meta["capacity"]
+        with open(f"{self.path}.ids", "r", encoding="utf-8") as f:
+            self.ids = [json.loads(line) for line in f][:meta["count"]]
+        self._positions = {doc_id: i for i, doc_id in enumerate(self.ids)}
+        self._open(mode="r+")
+        if os.path.exists(f"{self.path}.ivf.npz"):
+            self.ivf = IVFIndex.load(f"{self.path}.ivf.npz")
+
+    def _open(self, mode: str):
+        if self.capacity == 0:
+            self._vectors = None
+            self._scales = None
+            return
+        self._vectors = np.memmap(f"{self.path}.vec", dtype=np.dtype(self.dtype), mode=mode,
+                                  shape=(self.capacity, self.dim))
+        if self.dtype == "int8":
+            self._scales = np.memmap(f"{self.path}.scale", dtype=np.float32, mode=mode,
+                                     shape=(self.capacity,))
+
+    def _grow(self, needed: int):
+        if needed <= self.capacity:
+            return
+        new_capacity = max(needed, self.capacity * 2, 1024)
+        if self._vectors is not None:
+            self._vectors.flush()
+            if self._scales is not None:
+                self._scales.flush()
+        self._vectors = None
+        self._scales = None
+
+        itemsize = np.dtype(self.dtype).itemsize
+        with open(f"{self.path}.vec", "ab") as f:
+            f.truncate(new_capacity * self.dim * itemsize)
+        if self.dtype == "int8":
+            with open(f"{self.path}.scale", "ab") as f:
+                f.truncate(new_capacity * 4)
+
+        self.capacity = new_capacity
+        self._open(mode="r+")
+
+    def add(self, ids: List[str], vectors: np.ndarray):
+        """Append vectors; ids already in the index are overwritten in place.
+
+        An overwritten row that the IVF had clustered is marked stale there,
+        so approximate search scans it exactly until the IVF is rebuilt.
+        """
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.dim)
+        rows = []
+        new_ids = []
+        for doc_id in ids:
+            if doc_id in self._positions:
+                rows.append(self._positions[doc_id])
+            else:
+                rows.append(len(self.ids) + len(new_ids))
+                new_ids.append(doc_id)
+
+        self._grow(len(self.ids) + len(new_ids))
+        rows = np.asarray(rows, dtype=np.int64)
+
+        if self.ivf is not None:
+            clustered = rows[rows < self.ivf.indexed_count]
+            if clustered.size:
+                self.ivf.mark_stale(clustered)
+                self._ivf_dirty = True
+
+        if self.dtype == "int8":
+            scales = np.abs(vectors).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            self._vectors[rows] = np.round(vectors / scales[:, None]).astype(np.int8)
+            self._scales[rows] = scales
+        else:
+            self._vectors[rows] = vectors
+
+        with open(f"{self.path}.ids", "a", encoding="utf-8") as f:
+            for doc_id in new_ids:
+                self._positions[doc_id] = len(self.ids)
+                self.ids.append(doc_id)
+                f.write(json.dumps(doc_id) + "\n")
+
+    def flush(self):
+        if self._vectors is not None:
+            self._vectors.flush()
+        if self._scales is not None:
+            self._scales.flush()
+        with open(self._meta_path, "w", encoding="utf-8") as f:
+            json.dump({"dim": self.dim, "dtype": self.dtype, "count": len(self.ids),
+                       "capacity": self.capacity}, f)
+        if self._ivf_dirty:
+            self.ivf.save(f"{self.path}.ivf.npz")
+            self._ivf_dirty = False
+
+    def rows(self, start: int, stop: int) -> np.ndarray:
+        """Dequantized float32 copy of a contiguous row range"""
+        block = np.asarray(self._vectors[start:stop], dtype=np.float32)
+        if self.dtype == "int8":
+            block *= np.asarray(self._scales[start:stop])[:, None]
+        return block
+
+    def take(self, rows: np.ndarray) -> np.ndarray:
+        """Dequantized float32 copy of arbitrary rows"""
+        block = np.asarray(self._vectors[rows], dtype=np.float32)
+        if self.dtype == "int8":
+            block *= np.asarray(self._scales[rows])[:, None]
+        return block
+
+    def vector(self, doc_id: str) -> np.ndarray:
+        return self.take(np.asarray([self._positions[doc_id]]))[0]
+
+    def search_exact(self, queries: np.ndarray, k: int = 10,
+                     chunk_rows: int = SEARCH_CHUNK_ROWS) -> Tuple[np.ndarray, np.ndarray]:
+        """Brute-force top-k for a batch of queries, streaming the memmap in chunks"""
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        best_scores = np.full((queries.shape[0], 0), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((queries.shape[0], 0), dtype=np.int64)
+
+        for start in range(0, len(self.ids), chunk_rows):
+            stop = min(start + chunk_rows, len(self.ids))
+            # Scaling the scores instead of the int8 rows saves a full pass over the chunk
+            scores = queries @ np.asarray(self._vectors[start:stop], dtype=np.float32).T
+            if self.dtype == "int8":
+                scores *= np.asarray(self._scales[start:stop])[None, :]
+            best_scores, best_rows = _merge_top_k(best_scores, best_rows, scores,
+                                                  np.arange(start, stop), k)
+        return self._sorted(best_scores, best_rows)
+
+    def search(self, queries: np.ndarray, k: int = 10, nprobe: int = 8) -> List[List[Tuple[str, float]]]:
+        """Top-k (id, score) per query, using the IVF index when one has been built"""
+        if not self.ids:
+            return [[] for _ in np.atleast_2d(queries)]
+        if self.ivf is not None:
+            scores, rows = self.ivf.search(self, queries, k, nprobe)
+        else:
+            scores, rows = self.search_exact(queries, k)
+        return [
+            [(self.ids[r], float(s)) for s, r in zip(query_scores, query_rows) if np.isfinite(s)]
+            for query_scores, query_rows in zip(scores, rows)
+        ]
+
+    def build_ivf(self, nlist: Optional[int] = None, iterations: int = 10, sample_size: int = 50000):
+        """Cluster the stored vectors into an inverted-file index for approximate search"""
+        self.ivf = IVFIndex.build(self, nlist, iterations, sample_size)
+        self.ivf.save(f"{self.path}.ivf.npz")
+        self._ivf_dirty = False
+        return self.ivf
+
+    @staticmethod
+    def _sorted(scores: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        order = np.argsort(-scores, axis=1)
+        return np.take_along_axis(scores, order, axis=1), np.take_along_axis(rows, order, axis=1)
+
+
+class IVFIndex:
+    """Inverted-file approximate index: k-means centroids plus row lists per centroid.
+
+    Rows appended after the index was built are kept in an unclustered tail,
+    and rows overwritten since then are listed as stale; both are always
+    scanned exactly, so the IVF never returns stale results.
+    """
+
+    def __init__(self, centroids: np.ndarray, list_offsets: np.ndarray, list_rows: np.ndarray, indexed_count: int,
+                 stale_rows: Optional[np.ndarray] = None):
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.list_rows = list_rows
+        self.indexed_count = indexed_count
+        self.stale_rows = np.zeros(0, dtype=np.int64) if stale_rows is None else stale_rows
+
+    def mark_stale(self, rows: np.ndarray):
+        """Rows whose vectors changed after clustering and may now belong to another list"""
+        self.stale_rows = np.union1d(self.stale_rows, rows).astype(np.int64)
+
+    @classmethod
+    def build(cls, index: EmbeddingIndex, nlist: Optional[int] = None,
+              iterations: int = 10, sample_size: int = 50000) -> "IVFIndex":
+        count = len(index)
+        nlist = nlist or max(1, int(np.sqrt(count)))
+        rng = np.random.default_rng(0)
+
+        sample_rows = np.sort(rng.choice(count, size=min(sample_size, count), replace=False))
+        sample = index.take(sample_rows)
+        centroids = sample[rng.choice(sample.shape[0], size=min(nlist, sample.shape[0]), replace=False)]
+
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            empty = np.bincount(assignment, minlength=centroids.shape[0]) == 0
+            sums[empty] = centroids[empty]
+            centroids = _normalize_rows(sums)
+
+        assignment = np.empty(count, dtype=np.int64)
+        for start in range(0, count, SEARCH_CHUNK_ROWS):
+            stop = min(start + SEARCH_CHUNK_ROWS, count)
+            assignment[start:stop] = np.argmax(index.rows(start, stop) @ centroids.T, axis=1)
+
+        order = np.argsort(assignment, kind="stable")
+        sizes = np.bincount(assignment, minlength=centroids.shape[0])
+        list_offsets = np.concatenate([[0], np.cumsum(sizes)])
+        return cls(centroids, list_offsets, order, count)
+
+    def save(self, path: str):
+        np.savez(path, centroids=self.centroids, list_offsets=self.list_offsets,
+                 list_rows=self.list_rows, indexed_count=np.asarray(self.indexed_count),
+                 stale_rows=self.stale_rows)
+
+    @classmethod
+    def load(cls, path: str) -> "IVFIndex":
+        data = np.load(path)
+        stale_rows = data["stale_rows"] if "stale_rows" in data.files else None
+        return cls(data["centroids"], data["list_offsets"], data["list_rows"], int(data["indexed_count"]),
+                   stale_rows)
+
+    def search(self, index: EmbeddingIndex, queries: np.ndarray, k: int,
+               nprobe: int) -> Tuple[np.ndarray, np.ndarray]:
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        nprobe = min(nprobe, self.centroids.shape[0])
+        probes = np.argpartition(-(queries @ self.centroids.T), nprobe - 1, axis=1)[:, :nprobe]
+        tail = np.arange(self.indexed_count, len(index))
+
+        all_scores = np.full((queries.shape[0], k), -np.inf, dtype=np.float32)
+        all_rows = np.zeros((queries.shape[0], k), dtype=np.int64)
+        for q, query in enumerate(queries):
+            # unique() also sorts, and drops stale rows that were probed through their old list
+            candidates = np.unique(np.concatenate(
+                [self.list_rows[self.list_offsets[c]:self.list_offsets[c + 1]] for c in probes[q]]
+                + [tail, self.stale_rows]
+            ))
+            if candidates.size == 0:
+                continue
+            scores = index.take(candidates) @ query
+            keep = min(k, scores.shape[0])
+            part = np.argpartition(-scores, keep - 1)[:keep]
+            all_scores[q, :keep] = scores[part]
+            all_rows[q, :keep] = candidates[part]
+        return EmbeddingIndex._sorted(all_scores, all_rows)
+
+
+class CandidateSearch:
+    """Embeds analyzed resumes and answers similar-candidate and free-text queries"""
+
+    def __init__(self, path: str, embedder=None, dtype: str = "float32"):
+        self.embedder = embedder or load_embedder()
+        self.index = EmbeddingIndex(path, self.embedder.dim, dtype)
+
+    def add_analyses(self, analyses: Iterable[Tuple[str, Dict[str, Any]]]):
+        """Index (resume_id, analyze_resume result) pairs by resume text and summary.
+
+        Several worker processes write the same index, so the write happens
+        under a file lock against a freshly reloaded copy of it.
+        """
+        ids = []
+        texts = []
+        summaries = []
+        for resume_id, analysis in analyses:
+            ids.append(resume_id)
+            texts.append(analysis.get("resume_text", ""))
+            summaries.append(analysis.get("summary", ""))
+        if not ids:
+            return
+        vectors = _normalize_rows(self.embedder.embed(texts) + self.embedder.embed(summaries))
+        with open(f"{self.index.path}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                self.index = EmbeddingIndex(self.index.path, self.index.dim, self.index.dtype)
+                self.index.add(ids, vectors)
+                self.index.flush()
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def add_analysis(self, analysis: Dict[str, Any]) -> str:
+        """Index one analysis under the hash of its resume text, so distinct resumes never collide"""
+        resume_id = content_hash(analysis.get("resume_text", ""))
+        self.add_analyses([(resume_id, analysis)])
+        return resume_id
+
+    def similar_to(self, resume_id: str, k: int = 10) -> List[Tuple[str, float]]:
+        """Candidates closest to an already indexed resume, excluding itself"""
+        results = self.index.search(self.index.vector(resume_id)[None, :], k + 1)[0]
+        return [(doc_id, score) for doc_id, score in results if doc_id != resume_id][:k]
+
+    def query(self, texts: List[str], k: int = 10) -> List[List[Tuple[str, float]]]:
+        """Candidates matching each free-text query, embedded and searched as one batch"""
+        return self.index.search(self.embedder.embed(texts), k)
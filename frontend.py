@@ -1,17 +1,18 @@
 import streamlit as st
 import os
 from datetime import datetime
-import fitz
-import docx
 import logging
 from dotenv import load_dotenv
-from transformers import pipeline
-from langchain_groq import ChatGroq
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
-import streamlit as st
 from typing import List, Dict, Tuple, Any
 
+from backend import CareerNavigatorBackend
+from analysis_cache import compare_analyses
+from llm_providers import LLM_PROVIDER, PROVIDER_GROQ
+from embedding_index import CandidateSearch, CANDIDATE_INDEX_PATH
+from job_queue import JobQueue, WorkerPool, JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED
+
+logger = logging.getLogger(__name__)
+
 st.set_page_config(
     page_title="Career Navigator AI",
     page_icon="🚀",
@@ -137,6 +138,100 @@ if 'current_question_index' not in st.session_state:
     st.session_state.current_question_index = 0
 if 'interview_active' not in st.session_state:
     st.session_state.interview_active = False
+if 'analysis_job_id' not in st.session_state:
+    st.session_state.analysis_job_id = None
+if 'previous_analysis_results' not in st.session_state:
+    st.session_state.previous_analysis_results = None
+
+# Number of background analysis workers; 0 runs analysis inline in the script thread
+JOB_QUEUE_WORKERS = int(os.getenv("JOB_QUEUE_WORKERS", "2"))
+
+@st.cache_resource
+def get_job_queue():
+    """Shared job queue for this server process"""
+    return JobQueue()
+
+@st.cache_resource
+def get_worker_pool():
+    """One pool of warm analysis workers for the whole server, whatever the number of API keys"""
+    return WorkerPool(num_workers=JOB_QUEUE_WORKERS).start()
+
+def store_analysis_results(results):
+    """Keep the last successful analysis around so revisions can be compared against it"""
+    current = st.session_state.analysis_results
+    if current and current.get('success'):
+        st.session_state.previous_analysis_results = current
+    st.session_state.analysis_results = results
+
+@st.cache_resource
+def get_candidate_search():
+    """Candidate index for analyses run inline; None unless CANDIDATE_INDEX_PATH is set"""
+    if not CANDIDATE_INDEX_PATH:
+        return None
+    try:
+        return CandidateSearch(CANDIDATE_INDEX_PATH)
+    except Exception as e:
+        logger.error(f"Failed to open candidate index: {e}")
+        return None
+
+def submit_analysis(uploaded_file):
+    """Queue a resume analysis, or run it inline when no workers are configured"""
+    backend = st.session_state.backend
+
+    if JOB_QUEUE_WORKERS <= 0:
+        with st.spinner("🔄 Analyzing your resume..."):
+            results = backend.analyze_resume(uploaded_file)
+        store_analysis_results(results)
+        candidates = get_candidate_search()
+        if candidates is not None and results.get('success'):
+            try:
+                candidates.add_analysis(results)
+            except Exception as e:
+                logger.error(f"Failed to index resume for candidate search: {e}")
+        return
+
+    queue = get_job_queue()
+    if st.session_state.analysis_job_id is not None:
+        queue.cancel(st.session_state.analysis_job_id)
+
+    pool = get_worker_pool().start()
+    # The key stays in the pool's memory; the job row only records its tenant
+    tenant = pool.add_key(backend.groq_api_key)
+    st.session_state.analysis_job_id = queue.submit_analysis(uploaded_file, tenant=tenant)
+    store_analysis_results(None)
+
+@st.fragment(run_every="2s")
+def show_analysis_job_status():
+    """Poll the current analysis job and offer cancel/retry controls"""
+    job_id = st.session_state.analysis_job_id
+    if job_id is None:
+        return
+
+    queue = get_job_queue()
+    job = queue.get_status(job_id)
+    if job is None:
+        st.session_state.analysis_job_id = None
+        return
+
+    status = job['status']
+
+    if status == JOB_SUCCEEDED:
+        store_analysis_results(job['result'])
+        st.session_state.analysis_job_id = None
+        st.rerun()
+
+    if status in (JOB_QUEUED, JOB_RUNNING):
+        label = "cancelling" if job['cancel_requested'] else status
+        st.markdown(f'<div class="info-box">⏳ Analysis job is {label} (attempt {job["attempts"]}/{job["max_attempts"]})</div>', unsafe_allow_html=True)
+        if st.button("🛑 Cancel Analysis", key=f"cancel_{job_id}"):
+            queue.cancel(job_id)
+    else:
+        if status == JOB_FAILED:
+            st.markdown(f'<div class="error-message">❌ Analysis failed: {job.get("error") or "Unknown error"}</div>', unsafe_allow_html=True)
+        elif status == JOB_CANCELLED:
+            st.markdown('<div class="info-box">🛑 Analysis was cancelled.</div>', unsafe_allow_html=True)
+        if st.button("🔁 Retry Analysis", key=f"retry_{job_id}"):
+            queue.retry(job_id)
 
 def main():
     # Header
@@ -152,11 +247,16 @@ def main():
         st.markdown("### 🔧 Configuration")
         
         # API Key input
-        api_key = st.text_input(
-            "Enter GROQ API Key",
-            type="password",
-            help="Your GROQ API key for AI services"
-        )
+        if LLM_PROVIDER == PROVIDER_GROQ:
+            api_key = st.text_input(
+                "Enter GROQ API Key",
+                type="password",
+                help="Your GROQ API key for AI services"
+            )
+        else:
+            # On-prem providers need no key; the provider name stands in for it
+            api_key = LLM_PROVIDER
+            st.caption(f"🖥️ Using the '{LLM_PROVIDER}' LLM provider")
         
         if api_key:
             if st.session_state.backend is None:
@@ -187,6 +287,25 @@ def main():
         - **Resume Summary**: Professional summary generation
         - **Interview Simulation**: AI-powered interview practice
         """)
+        
+        if st.session_state.backend is not None:
+            report = st.session_state.backend.latency_report()
+            if report['caller']:
+                with st.expander("📈 LLM Latency", expanded=False):
+                    st.caption(f"Provider: {report['llm_provider']} · Circuit: {report['breaker_state']} · Hedged: {report['hedged_calls']}/{report['total_calls']}")
+                    for chain, stats in report['caller'].items():
+                        raw = report['provider'].get(chain)
+                        st.markdown(f"**{chain}** p50 {stats['p50']:.1f}s · p95 {stats['p95']:.1f}s · p99 {stats['p99']:.1f}s")
+                        if raw:
+                            st.caption(f"raw attempts: p50 {raw['p50']:.1f}s · p95 {raw['p95']:.1f}s · p99 {raw['p99']:.1f}s")
+
+            with st.expander("🚦 LLM Queue", expanded=False):
+                jobs = get_job_queue().queue_depth_by_priority() if JOB_QUEUE_WORKERS > 0 else {}
+                for cls, depth in report['scheduler'].items():
+                    line = f"**{cls}** waiting {depth['queued']} · running {depth['running']}"
+                    if cls in jobs:
+                        line += f" · jobs queued {jobs[cls]['queued']} · jobs running {jobs[cls]['running']}"
+                    st.markdown(line)
 
     # Main content area
     if not api_key:
@@ -243,9 +362,9 @@ def show_resume_analysis(uploaded_file):
         
         with col2:
             if st.button("🔍 Analyze Resume", key="analyze_btn"):
-                with st.spinner("🔄 Analyzing your resume..."):
-                    results = st.session_state.backend.analyze_resume(uploaded_file)
-                    st.session_state.analysis_results = results
+                submit_analysis(uploaded_file)
+        
+        show_analysis_job_status()
         
         if st.session_state.analysis_results:
             results = st.session_state.analysis_results
@@ -283,29 +402,108 @@ def show_resume_analysis(uploaded_file):
                     st.markdown(f"**Text Length:** {len(results['resume_text'])} characters")
                     st.markdown(f"**Keywords Found:** {len(results['keywords'])}")
                     st.markdown(f"**Analysis Date:** {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+                    if results.get('reused_artifacts'):
+                        st.markdown(f"**Reused From Cache:** {', '.join(results['reused_artifacts'])}")
+                    
+                    ocr_report = results.get('ocr_report')
+                    if ocr_report:
+                        pages = ", ".join(f"{p['page']} ({p['seconds']:.1f}s)" for p in ocr_report['ocr_pages'])
+                        st.markdown(f"**OCR'd Pages:** {pages or 'None'}")
+                        if ocr_report['skipped_pages']:
+                            st.markdown(f"**Not OCR'd (page cap):** {', '.join(map(str, ocr_report['skipped_pages']))}")
+                        if ocr_report['error']:
+                            st.warning(f"OCR unavailable: {ocr_report['error']}")
+                
+                if st.session_state.previous_analysis_results:
+                    show_analysis_diff(st.session_state.previous_analysis_results, results)
                 
             else:
                 st.markdown(f'<div class="error-message">❌ Analysis failed: {results.get("error", "Unknown error")}</div>', unsafe_allow_html=True)
     else:
         st.markdown('<div class="info-box">📁 Please upload a resume file to begin analysis.</div>', unsafe_allow_html=True)
 
+def show_analysis_diff(previous, current):
+    diff = compare_analyses(previous, current)
+    
+    with st.expander("🔄 Changes Since Previous Version", expanded=True):
+        col1, col2, col3 = st.columns(3)
+        
+        score = diff['ats_score']
+        with col1:
+            st.metric("ATS Score", score['current'] if score['current'] is not None else "N/A",
+                      delta=score['delta'])
+        with col2:
+            st.metric("Modified Sections", len(diff['sections']['modified']) + len(diff['sections']['added']))
+        with col3:
+            st.metric("Unchanged Sections", len(diff['sections']['unchanged']))
+        
+        if diff['role']['changed']:
+            st.markdown(f"**Role:** {diff['role']['previous']} → {diff['role']['current']}")
+        
+        for label, names in [("Added", diff['sections']['added']),
+                             ("Modified", diff['sections']['modified']),
+                             ("Removed", diff['sections']['removed'])]:
+            if names:
+                st.markdown(f"**{label} Sections:** {', '.join(names)}")
+        
+        if diff['keywords']['added'] or diff['keywords']['removed']:
+            st.markdown(f"**New Keywords:** {', '.join(diff['keywords']['added']) or 'None'}")
+            st.markdown(f"**Dropped Keywords:** {', '.join(diff['keywords']['removed']) or 'None'}")
+        
+        if diff['ats_feedback_diff']:
+            st.markdown("#### 📈 ATS Feedback Changes")
+            st.code(diff['ats_feedback_diff'], language="diff")
+        
+        if diff['summary_diff']:
+            st.markdown("#### 📝 Summary Changes")
+            st.code(diff['summary_diff'], language="diff")
+
 def show_ats_feedback(uploaded_file):
     st.markdown("### 🎯 ATS Compatibility Analysis")
     
     if uploaded_file is not None:
         col1, col2 = st.columns([3, 1])
         
+        with col1:
+            job_description = st.text_area(
+                "Target Job Description (optional)",
+                height=150,
+                placeholder="Paste a job description to see matching and missing keywords..."
+            )
+        
         with col2:
             if st.button("📊 Get ATS Score", key="ats_btn"):
                 with st.spinner("🔄 Analyzing ATS compatibility..."):
-                    resume_text = st.session_state.backend.extract_text_from_file(uploaded_file)
-                    ats_feedback = st.session_state.backend.get_ats_feedback(resume_text)
+                    backend = st.session_state.backend
+                    resume_text = backend.extract_text_from_file(uploaded_file)
+                    ats_feedback = backend.get_ats_feedback(resume_text)
                     st.session_state.ats_result = ats_feedback
+                    if job_description.strip():
+                        keywords = backend.extract_keywords(resume_text)
+                        st.session_state.jd_match_result = backend.match_job_description(
+                            resume_text, job_description, keywords
+                        )
+                    else:
+                        st.session_state.jd_match_result = None
         
         if hasattr(st.session_state, 'ats_result'):
             st.markdown("#### 📈 ATS Analysis Results")
             st.markdown(f"```\n{st.session_state.ats_result}\n```")
             
+            match = st.session_state.get('jd_match_result')
+            if match:
+                st.markdown("#### 🧩 Job Description Match")
+                st.metric("Keyword Coverage", f"{match['coverage']:.0%}")
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.markdown("**✅ Matching Keywords**")
+                    for keyword in match['overlapping_keywords'] or ["None found"]:
+                        st.markdown(f"• {keyword}")
+                with col2:
+                    st.markdown("**➕ Missing Keywords**")
+                    for keyword in match['missing_keywords'] or ["None"]:
+                        st.markdown(f"• {keyword}")
+            
             # Additional tips
             st.markdown("#### 💡 ATS Optimization Tips")
             st.markdown("""
@@ -361,9 +559,9 @@ def show_interview_simulation(uploaded_file):
             col1, col2 = st.columns([3, 1])
             with col2:
                 if st.button("🔍 Analyze for Interview", key="interview_analyze_btn"):
-                    with st.spinner("🔄 Analyzing resume for interview preparation..."):
-                        results = st.session_state.backend.analyze_resume(uploaded_file)
-                        st.session_state.analysis_results = results
+                    submit_analysis(uploaded_file)
+            
+            show_analysis_job_status()
         
         if st.session_state.analysis_results and st.session_state.analysis_results.get('success'):
             role = st.session_state.analysis_results['role']
@@ -419,10 +617,23 @@ def show_interview_simulation(uploaded_file):
                     
                     if st.button("✅ Submit Answer", key=f"submit_{current_q_index}"):
                         if answer.strip():
+                            backend = st.session_state.backend
+                            keywords = st.session_state.analysis_results.get('keywords')
+                            # Shown immediately, then replaced once the LLM evaluation lands
+                            provisional = backend.pre_score_answer(role, current_question, answer, keywords)
+                            placeholder = st.empty()
+                            with placeholder.container():
+                                st.markdown(f"""
+                                <div class="evaluation-box">
+                                    <h5>⏱️ Provisional Score: {provisional['score']}/10</h5>
+                                    <p>{' '.join(provisional['hints']) or 'Well-structured answer.'}</p>
+                                </div>
+                                """, unsafe_allow_html=True)
                             with st.spinner("🔄 Evaluating your answer..."):
-                                evaluation = st.session_state.backend.evaluate_answer(role, current_question, answer)
+                                evaluation = backend.evaluate_answer(role, current_question, answer, keywords)
                                 st.session_state.interview_answers.append(answer)
                                 st.session_state.interview_evaluations.append(evaluation)
+                            placeholder.empty()
                         else:
                             st.warning("Please provide an answer before submitting.")
                 
@@ -457,258 +668,5 @@ def show_interview_simulation(uploaded_file):
     else:
         st.markdown('<div class="info-box">📁 Please upload a resume file to start interview simulation.</div>', unsafe_allow_html=True)
 
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-class CareerNavigatorBackend:
-    def __init__(self, groq_api_key: str):
-        """Initialize the Career Navigator with API key"""
-        self.groq_api_key = groq_api_key
-        self.llm = None
-        self.chains = {}
-        self.ner_model = None
-        self._setup_llm()
-        self._setup_chains()
-        self._setup_ner_model()
-
-    def _setup_llm(self):
-        """Configure the LLM"""
-        try:
-            self.llm = ChatGroq(
-                model_name="llama3-8b-8192",
-                temperature=0.3,
-                api_key=self.groq_api_key
-            )
-        except Exception as e:
-            logger.error(f"Failed to initialize LLM: {e}")
-            raise
-
-    def _setup_chains(self):
-        """Setup all LLM chains"""
-        role_prompt = PromptTemplate.from_template(
-            """Analyze this resume and identify the most likely job role/position this person is seeking or qualified for.
-            Consider their experience, skills, and background.
-            
-            Resume:
-            {resume}
-            
-            Return only the specific job role title (e.g., "Software Engineer", "Data Scientist", "Marketing Manager"):"""
-        )
-
-        interview_question_prompt = PromptTemplate.from_template(
-            """Generate a technical interview question for a {role} position.
-            The question should be:
-            - Relevant to the role
-            - Moderately challenging
-            - Practical and realistic
-            
-            
-            Return only the question without any additional text:"""
-        )
-
-        evaluate_prompt = PromptTemplate.from_template(
-            """Evaluate this interview answer for a {role} position:
-            
-            Question: {question}
-            Answer: {answer}
-            
-            Provide:
-            1. Score out of 10
-            2. Brief explanation of strengths and weaknesses
-            3. Suggestions for improvement
-            
-            Format your response as:
-            Score: X/10
-            Evaluation: [Your detailed feedback]"""
-        )
-
-        ats_prompt = PromptTemplate.from_template(
-            """You are an ATS (Applicant Tracking System) analyzing this resume.
-            
-            Resume:
-            {resume}
-            
-            Provide:
-            1. Overall ATS score out of 100
-            2. Key strengths identified
-            3. Areas needing improvement
-            4. Specific recommendations to improve ATS compatibility
-            
-            Format your response as:
-            ATS Score: X/100
-            Strengths: [List key strengths]
-            Areas for Improvement: [List improvement areas]
-            Recommendations: [Specific actionable recommendations]"""
-        )
-
-        summarize_prompt = PromptTemplate.from_template(
-            """Create a concise professional summary of this resume:
-            
-            Resume:
-            {resume}
-            
-            Provide:
-            1. Professional summary (2-3 sentences)
-            2. Key skills and expertise
-            3. Years of experience
-            4. Notable achievements
-            
-            Format your response clearly and professionally."""
-        )
-
-        self.chains = {
-            'role': LLMChain(prompt=role_prompt, llm=self.llm),
-            'question': LLMChain(prompt=interview_question_prompt, llm=self.llm),
-            'evaluate': LLMChain(prompt=evaluate_prompt, llm=self.llm),
-            'ats': LLMChain(prompt=ats_prompt, llm=self.llm),
-            'summarize': LLMChain(prompt=summarize_prompt, llm=self.llm)
-        }
-
-    @st.cache_resource
-    def _setup_ner_model(_self):
-        """Setup NER model for keyword extraction"""
-        try:
-            return pipeline("ner", model="dslim/bert-base-NER")
-        except Exception as e:
-            logger.error(f"Failed to load NER model: {e}")
-            return None
-
-    def extract_text_from_file(self, uploaded_file) -> str:
-        """Extract text from uploaded file"""
-        try:
-            if uploaded_file.type == "application/pdf":
-                with open("temp.pdf", "wb") as f:
-                    f.write(uploaded_file.getvalue())
-                
-                doc = fitz.open("temp.pdf")
-                text = "\n".join([page.get_text() for page in doc])
-                doc.close()
-                os.remove("temp.pdf")
-                return text
-                
-            elif uploaded_file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-                with open("temp.docx", "wb") as f:
-                    f.write(uploaded_file.getvalue())
-                
-                doc = docx.Document("temp.docx")
-                text = "\n".join([p.text for p in doc.paragraphs])
-                os.remove("temp.docx")
-                return text
-                
-            else:
-                raise ValueError("Unsupported file format. Please upload PDF or DOCX files.")
-                
-        except Exception as e:
-            logger.error(f"Failed to extract text from file: {e}")
-            raise
-
-    def extract_keywords(self, resume_text: str) -> List[str]:
-        """Extract keywords using NER model"""
-        try:
-            if self.ner_model is None:
-                self.ner_model = self._setup_ner_model()
-            
-            if self.ner_model is None:
-                return []
-                
-            entities = self.ner_model(resume_text)
-            keywords = list(set(ent["word"] for ent in entities if ent["entity"].startswith("B-")))
-            
-            keywords = [kw.replace("##", "").strip() for kw in keywords if len(kw) > 2]
-            return keywords[:20]  
-        except Exception as e:
-            logger.error(f"Failed to extract keywords: {e}")
-            return []
-
-    def identify_role(self, resume_text: str) -> str:
-        """Identify the most likely job role from resume"""
-        try:
-            role = self.chains['role'].run({"resume": resume_text}).strip()
-            return role
-        except Exception as e:
-            logger.error(f"Failed to identify role: {e}")
-            return "General Professional"
-
-    def get_ats_feedback(self, resume_text: str) -> str:
-        """Get ATS feedback and scoring"""
-        try:
-            feedback = self.chains['ats'].run({"resume": resume_text}).strip()
-            return feedback
-        except Exception as e:
-            logger.error(f"Failed to get ATS feedback: {e}")
-            return "Unable to generate ATS feedback at this time."
-
-    def summarize_resume(self, resume_text: str) -> str:
-        """Generate resume summary"""
-        try:
-            summary = self.chains['summarize'].run({"resume": resume_text}).strip()
-            return summary
-        except Exception as e:
-            logger.error(f"Failed to summarize resume: {e}")
-            return "Unable to generate resume summary at this time."
-
-    def generate_interview_question(self, role: str) -> str:
-        """Generate interview question for specific role"""
-        try:
-            question = self.chains['question'].run({"role": role}).strip()
-            return question
-        except Exception as e:
-            logger.error(f"Failed to generate interview question: {e}")
-            return f"Tell me about your experience in {role}?"
-
-    def evaluate_answer(self, role: str, question: str, answer: str) -> str:
-        """Evaluate interview answer"""
-        try:
-            evaluation = self.chains['evaluate'].run({
-                "role": role,
-                "question": question,
-                "answer": answer
-            }).strip()
-            return evaluation
-        except Exception as e:
-            logger.error(f"Failed to evaluate answer: {e}")
-            return "Score: 5/10\nEvaluation: Unable to evaluate answer at this time."
-
-    def analyze_resume(self, uploaded_file) -> Dict[str, Any]:
-        """Complete resume analysis pipeline"""
-        try:
-            resume_text = self.extract_text_from_file(uploaded_file)
-            
-            role = self.identify_role(resume_text)
-            ats_feedback = self.get_ats_feedback(resume_text)
-            summary = self.summarize_resume(resume_text)
-            keywords = self.extract_keywords(resume_text)
-            
-            return {
-                "resume_text": resume_text,
-                "role": role,
-                "ats_feedback": ats_feedback,
-                "summary": summary,
-                "keywords": keywords,
-                "success": True
-            }
-            
-        except Exception as e:
-            logger.error(f"Failed to analyze resume: {e}")
-            return {
-                "success": False,
-                "error": str(e)
-            }
-
-    def conduct_interview_session(self, role: str) -> Dict[str, str]:
-        """Generate a single interview question for the session"""
-        try:
-            question = self.generate_interview_question(role)
-            return {
-                "question": question,
-                "success": True
-            }
-        except Exception as e:
-            logger.error(f"Failed to conduct interview: {e}")
-            return {
-                "success": False,
-                "error": str(e)
-            }
-
 if __name__ == "__main__":
     main()
@@ -0,0 +1,283 @@
+import re
+import json
+import logging
+import numpy as np
+import scipy.sparse as sp
+from typing import List, Dict, Tuple, Any, Optional, Iterable
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[.\-][a-z0-9+#]+)*")
+
+STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being below between both
+but by can could did do does doing down during each etc few for from further had has have having he her here
+hers him his how i if in into is it its itself just me more most my no nor not of off on once only or other our
+ours out over own per same she should so some such than that the their them then there these they this those
+through to too under until up very via was we were what when where which while who whom why will with within
+would you your yours years year experience work working role team teams strong ability able using use new
+including well etc must plus
+""".split())
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens that keep tech terms like c++, c#, node.js and ci-cd intact"""
+    return [t for t in TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+class Vocabulary:
+    """Growing term-to-column mapping shared by every index of a matcher"""
+
+    def __init__(self):
+        self.term_ids: Dict[str, int] = {}
+        self.terms: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def ids(self, tokens: Iterable[str], grow: bool = True) -> List[int]:
+        ids = []
+        for token in tokens:
+            term_id = self.term_ids.get(token)
+            if term_id is None:
+                if not grow:
+                    continue
+                term_id = len(self.terms)
+                self.term_ids[token] = term_id
+                self.terms.append(token)
+            ids.append(term_id)
+        return ids
+
+
+class SparseTermIndex:
+    """Append-only sparse term-count matrix with lazily derived TF-IDF or BM25 weights.
+
+    New documents are tokenized once and appended as a CSR block; document
+    frequencies are updated in place. Only the O(nnz) reweighting is redone
+    after an append, never tokenization or vocabulary building.
+    """
+
+    def __init__(self, vocabulary: Vocabulary, scheme: str = "bm25"):
+        if scheme not in ("bm25", "tfidf"):
+            raise ValueError(f"Unknown weighting scheme: {scheme}")
+        self.vocabulary = vocabulary
+        self.scheme = scheme
+        self.doc_ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._blocks: List[sp.csr_matrix] = []
+        self._doc_freq = np.zeros(0, dtype=np.int64)
+        self._doc_lengths = np.zeros(0, dtype=np.float64)
+        self._weights: Optional[sp.csr_matrix] = None
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def _count_rows(self, texts: List[str], grow: bool) -> sp.csr_matrix:
+        indptr = [0]
+        indices = []
+        data = []
+        for text in texts:
+            ids, counts = np.unique(self.vocabulary.ids(tokenize(text), grow=grow), return_counts=True)
+            indices.extend(ids.tolist())
+            data.extend(counts.tolist())
+            indptr.append(len(indices))
+        return sp.csr_matrix(
+            (np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int64), np.asarray(indptr)),
+            shape=(len(texts), len(self.vocabulary))
+        )
+
+    def add(self, documents: Iterable[Tuple[str, str]]):
+        """Append (doc_id, text) pairs; re-adding an existing id is skipped"""
+        new_docs = [(doc_id, text) for doc_id, text in documents if doc_id not in self._positions]
+        if not new_docs:
+            return
+
+        block = self._count_rows([text for _, text in new_docs], grow=True)
+
+        vocab_size = len(self.vocabulary)
+        if self._doc_freq.shape[0] < vocab_size:
+            self._doc_freq = np.concatenate(
+                [self._doc_freq, np.zeros(vocab_size - self._doc_freq.shape[0], dtype=np.int64)]
+            )
+        np.add.at(self._doc_freq, block.indices, 1)
+        self._doc_lengths = np.concatenate([self._doc_lengths, np.asarray(block.sum(axis=1)).ravel()])
+
+        for doc_id, _ in new_docs:
+            self._positions[doc_id] = len(self.doc_ids)
+            self.doc_ids.append(doc_id)
+
+        self._blocks.append(block)
+        self._weights = None
+
+    def counts(self) -> sp.csr_matrix:
+        """All term counts as one CSR matrix sized to the current vocabulary"""
+        vocab_size = len(self.vocabulary)
+        if not self._blocks:
+            return sp.csr_matrix((0, vocab_size))
+        if len(self._blocks) > 1 or self._blocks[0].shape[1] != vocab_size:
+            for block in self._blocks:
+                block.resize((block.shape[0], vocab_size))
+            self._blocks = [sp.vstack(self._blocks, format="csr")]
+        return self._blocks[0]
+
+    def idf(self) -> np.ndarray:
+        n_docs = max(len(self.doc_ids), 1)
+        doc_freq = np.zeros(len(self.vocabulary))
+        doc_freq[:self._doc_freq.shape[0]] = self._doc_freq
+        if self.scheme == "bm25":
+            return np.log((n_docs - doc_freq + 0.5) / (doc_freq + 0.5) + 1.0)
+        return np.log((1.0 + n_docs) / (1.0 + doc_freq)) + 1.0
+
+    def weights(self) -> sp.csr_matrix:
+        """Row-weighted document matrix, recomputed only after documents were added"""
+        vocab_size = len(self.vocabulary)
+        if self._weights is not None:
+            # Terms added through another index leave this index's statistics untouched
+            if self._weights.shape[1] != vocab_size:
+                self._weights.resize((self._weights.shape[0], vocab_size))
+            return self._weights
+
+        counts = self.counts()
+        weights = counts.copy()
+        if weights.nnz:
+            idf = self.idf()
+            rows = np.repeat(np.arange(weights.shape[0]), np.diff(weights.indptr))
+            tf = weights.data
+            if self.scheme == "bm25":
+                avg_length = max(self._doc_lengths.mean(), 1.0)
+                norm = BM25_K1 * (1.0 - BM25_B + BM25_B * self._doc_lengths[rows] / avg_length)
+                weights.data = idf[weights.indices] * tf * (BM25_K1 + 1.0) / (tf + norm)
+            else:
+                weights.data = idf[weights.indices] * (1.0 + np.log(tf))
+                row_norms = np.sqrt(np.asarray(weights.multiply(weights).sum(axis=1)).ravel())
+                row_norms[row_norms == 0] = 1.0
+                weights.data /= row_norms[rows]
+
+        self._weights = weights
+        return weights
+
+    def query_matrix(self, texts: List[str]) -> sp.csr_matrix:
+        """Vectorize queries against this index's statistics without growing the vocabulary"""
+        queries = self._count_rows(texts, grow=False)
+        queries.resize((queries.shape[0], len(self.vocabulary)))
+        if self.scheme == "bm25":
+            queries.data = np.ones_like(queries.data)
+            return queries
+
+        if queries.nnz:
+            idf = self.idf()
+            queries.data = idf[queries.indices] * (1.0 + np.log(queries.data))
+            rows = np.repeat(np.arange(queries.shape[0]), np.diff(queries.indptr))
+            row_norms = np.sqrt(np.asarray(queries.multiply(queries).sum(axis=1)).ravel())
+            row_norms[row_norms == 0] = 1.0
+            queries.data /= row_norms[rows]
+        return queries
+
+    def score(self, texts: List[str]) -> np.ndarray:
+        """Scores of every document for every query, as one sparse product (queries x docs)"""
+        if not self.doc_ids:
+            return np.zeros((len(texts), 0))
+        return (self.query_matrix(texts) @ self.weights().T).toarray()
+
+    def row_terms(self, doc_id: str) -> Dict[str, float]:
+        """Weighted terms of one stored document"""
+        weights = self.weights()
+        row = weights.getrow(self._positions[doc_id])
+        return {self.vocabulary.terms[i]: w for i, w in zip(row.indices, row.data)}
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._positions
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest positive scores, best first"""
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    candidates = candidates[np.argsort(-scores[candidates])]
+    return candidates[scores[candidates] > 0]
+
+
+class JobMatcher:
+    """Ranks resumes against job descriptions and vice versa over shared sparse indexes"""
+
+    def __init__(self, scheme: str = "bm25", missing_keyword_limit: int = 15):
+        self.vocabulary = Vocabulary()
+        self.jobs = SparseTermIndex(self.vocabulary, scheme)
+        self.resumes = SparseTermIndex(self.vocabulary, scheme)
+        self.missing_keyword_limit = missing_keyword_limit
+
+    def add_job_descriptions(self, job_descriptions: Iterable[Tuple[str, str]]):
+        """Add (job_id, text) pairs to the catalog without rebuilding it"""
+        self.jobs.add(job_descriptions)
+
+    def add_resumes(self, resumes: Iterable[Tuple[str, str]]):
+        """Add (resume_id, text) pairs to the candidate pool without rebuilding it"""
+        self.resumes.add(resumes)
+
+    def load_job_descriptions(self, path: str) -> int:
+        """Load a JSONL catalog of {"id": ..., "text": ...} records"""
+        with open(path, "r", encoding="utf-8") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        self.add_job_descriptions((str(r["id"]), r["text"]) for r in records)
+        logger.info(f"Loaded {len(records)} job descriptions from {path}")
+        return len(records)
+
+    def keyword_gap(self, resume_text: str, job_id: str,
+                    keywords: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Resume keywords the job asks for, and the job's strongest terms the resume lacks"""
+        resume_tokens = set(tokenize(resume_text))
+        job_terms = self.jobs.row_terms(job_id)
+
+        overlapping = []
+        for keyword in keywords or []:
+            keyword_tokens = tokenize(keyword)
+            if keyword_tokens and all(t in job_terms for t in keyword_tokens):
+                overlapping.append(keyword)
+
+        ranked_terms = sorted(job_terms.items(), key=lambda item: -item[1])
+        missing = [term for term, _ in ranked_terms if term not in resume_tokens]
+
+        total_weight = sum(job_terms.values())
+        covered_weight = sum(w for term, w in job_terms.items() if term in resume_tokens)
+
+        return {
+            "coverage": covered_weight / total_weight if total_weight else 0.0,
+            "overlapping_keywords": overlapping,
+            "missing_keywords": missing[:self.missing_keyword_limit]
+        }
+
+    def match_resumes_to_jobs(self, resume_texts: List[str], top_n: int = 10,
+                              keywords: Optional[List[List[str]]] = None) -> List[List[Dict[str, Any]]]:
+        """Best jobs for each resume, scored in a single sparse matrix product"""
+        scores = self.jobs.score(resume_texts)
+        matches = []
+        for i, resume_text in enumerate(resume_texts):
+            resume_keywords = keywords[i] if keywords else None
+            ranked = []
+            for j in top_k(scores[i], top_n):
+                job_id = self.jobs.doc_ids[j]
+                ranked.append({
+                    "job_id": job_id,
+                    "score": float(scores[i, j]),
+                    **self.keyword_gap(resume_text, job_id, resume_keywords)
+                })
+            matches.append(ranked)
+        return matches
+
+    def match_resume(self, resume_text: str, top_n: int = 10,
+                     keywords: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Best jobs for one resume"""
+        return self.match_resumes_to_jobs([resume_text], top_n, [keywords] if keywords else None)[0]
+
+    def match_job(self, job_text: str, top_n: int = 10) -> List[Dict[str, Any]]:
+        """Best candidates for one job description"""
+        scores = self.resumes.score([job_text])[0]
+        return [
+            {"resume_id": self.resumes.doc_ids[i], "score": float(scores[i])}
+            for i in top_k(scores, top_n)
+        ]
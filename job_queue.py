@@ -0,0 +1,570 @@
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import logging
+import argparse
+import threading
+import mimetypes
+import multiprocessing
+from collections import OrderedDict
+from dotenv import load_dotenv
+from typing import List, Dict, Any, Optional, Sequence
+
+from embedding_index import CandidateSearch, CANDIDATE_INDEX_PATH
+from llm_providers import LLM_PROVIDER, PROVIDER_GROQ, tenant_for
+from llm_scheduler import PRIORITY_CLASSES, PRIORITY_ANALYSIS, PRIORITY_BATCH
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+ACTIVE_STATUSES = (JOB_QUEUED, JOB_RUNNING)
+FINISHED_STATUSES = (JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED)
+
+DEFAULT_DB_PATH = os.getenv("JOB_QUEUE_DB", "career_navigator_jobs.db")
+DEFAULT_LEASE_SECONDS = int(os.getenv("JOB_QUEUE_LEASE_SECONDS", "600"))
+DEFAULT_MAX_ATTEMPTS = int(os.getenv("JOB_QUEUE_MAX_ATTEMPTS", "3"))
+# A queued job moves up one priority class for every this many seconds it waits
+PRIORITY_AGING_SECONDS = float(os.getenv("JOB_QUEUE_PRIORITY_AGING_SECONDS", "300"))
+# Workers per pool that never take batch jobs, so interactive analyses never wait behind a full batch backlog
+RESERVED_INTERACTIVE_WORKERS = int(os.getenv("JOB_QUEUE_RESERVED_INTERACTIVE_WORKERS", "1"))
+# Finished jobs (and the resume text in their results) are deleted after this long
+JOB_RETENTION_SECONDS = float(os.getenv("JOB_QUEUE_RETENTION_SECONDS", "86400"))
+PURGE_INTERVAL_SECONDS = 600
+# Backends, one per API key, each worker keeps warm; they share the worker's NER model
+WORKER_MAX_BACKENDS = int(os.getenv("JOB_QUEUE_WORKER_MAX_BACKENDS", "8"))
+
+
+class StoredUpload:
+    """Stand-in for a Streamlit UploadedFile rebuilt from queued bytes"""
+
+    def __init__(self, name: str, type: str, data: bytes):
+        self.name = name
+        self.type = type
+        self._data = data
+
+    @property
+    def size(self) -> int:
+        return len(self._data)
+
+    def getvalue(self) -> bytes:
+        return self._data
+
+
+class JobQueue:
+    """Durable SQLite-backed queue shared by the frontend and worker processes"""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH,
+                 lease_seconds: int = DEFAULT_LEASE_SECONDS,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _init_schema(self):
+        conn = self._connect()
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    file_data BLOB,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL,
+                    cancel_requested INTEGER NOT NULL DEFAULT 0,
+                    worker_id TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    lease_expires_at REAL,
+                    priority TEXT NOT NULL DEFAULT 'interactive_analysis',
+                    tenant TEXT NOT NULL DEFAULT ''
+                )
+            """)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "priority" not in columns:
+                conn.execute(f"ALTER TABLE jobs ADD COLUMN priority TEXT NOT NULL DEFAULT '{PRIORITY_ANALYSIS}'")
+            if "tenant" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN tenant TEXT NOT NULL DEFAULT ''")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+        finally:
+            conn.close()
+
+    def submit(self, kind: str, payload: Dict[str, Any], file_data: Optional[bytes] = None,
+               max_attempts: Optional[int] = None, priority: str = PRIORITY_ANALYSIS,
+               tenant: str = "") -> str:
+        """Add a job to the queue and return its id.
+
+        Only workers started for the same tenant (see tenant_for) will claim it.
+        """
+        if priority not in PRIORITY_CLASSES:
+            raise ValueError(f"Unknown priority class: {priority}")
+
+        job_id = uuid.uuid4().hex
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, status, payload, file_data, max_attempts, created_at, priority, tenant) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, JOB_QUEUED, json.dumps(payload), file_data,
+                 max_attempts or self.max_attempts, time.time(), priority, tenant)
+            )
+        finally:
+            conn.close()
+        logger.info(f"Queued {priority} {kind} job {job_id}")
+        return job_id
+
+    def submit_analysis(self, uploaded_file, priority: str = PRIORITY_ANALYSIS, tenant: str = "") -> str:
+        """Queue a full resume analysis for an uploaded file"""
+        return self.submit(
+            "analyze_resume",
+            {"name": uploaded_file.name, "type": uploaded_file.type},
+            file_data=uploaded_file.getvalue(),
+            priority=priority,
+            tenant=tenant
+        )
+
+    def get_status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the public view of a job, or None if it does not exist"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT id, kind, status, priority, result, error, attempts, max_attempts, cancel_requested, "
+                "created_at, started_at, finished_at FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+
+        if row is None:
+            return None
+
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued job immediately, or flag a running job for cancellation"""
+        conn = self._connect()
+        try:
+            cur = conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+                (JOB_CANCELLED, time.time(), job_id, JOB_QUEUED)
+            )
+            if cur.rowcount:
+                return True
+            cur = conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?",
+                (job_id, JOB_RUNNING)
+            )
+            return bool(cur.rowcount)
+        finally:
+            conn.close()
+
+    def retry(self, job_id: str) -> bool:
+        """Put a failed or cancelled job back on the queue with a fresh attempt budget"""
+        conn = self._connect()
+        try:
+            cur = conn.execute(
+                "UPDATE jobs SET status = ?, attempts = 0, cancel_requested = 0, error = NULL, "
+                "result = NULL, worker_id = NULL, started_at = NULL, finished_at = NULL, "
+                "lease_expires_at = NULL WHERE id = ? AND status IN (?, ?)",
+                (JOB_QUEUED, job_id, JOB_FAILED, JOB_CANCELLED)
+            )
+            return bool(cur.rowcount)
+        finally:
+            conn.close()
+
+    def claim_next(self, worker_id: str, tenants: Sequence[str] = ("",),
+                   allow_batch: bool = True) -> Optional[Dict[str, Any]]:
+        """Atomically lease the next queued job of one of the given tenants to a worker.
+
+        Jobs are taken in priority-class order, oldest first, but every
+        PRIORITY_AGING_SECONDS of waiting lifts a job one class so a steady
+        stream of interactive work cannot starve batch jobs forever.
+        """
+        tenants = list(tenants)
+        if not tenants:
+            return None
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            # Jobs whose worker died mid-run go back on the queue once their lease lapses, unless
+            # they have used up their attempts: a job that crashes its worker must not loop forever
+            conn.execute(
+                "UPDATE jobs SET status = CASE "
+                "WHEN cancel_requested THEN ? "
+                "WHEN attempts < max_attempts THEN ? ELSE ? END, "
+                "error = CASE WHEN attempts < max_attempts THEN error ELSE ? END, "
+                "finished_at = CASE WHEN cancel_requested OR attempts >= max_attempts THEN ? ELSE NULL END, "
+                "worker_id = NULL, lease_expires_at = NULL "
+                "WHERE status = ? AND lease_expires_at < ?",
+                (JOB_CANCELLED, JOB_QUEUED, JOB_FAILED,
+                 "Worker stopped responding on the last attempt", now, JOB_RUNNING, now)
+            )
+            rank = " ".join(f"WHEN '{cls}' THEN {i}" for i, cls in enumerate(PRIORITY_CLASSES))
+            row = conn.execute(
+                "SELECT id, kind, payload, file_data, attempts, priority, tenant FROM jobs WHERE status = ? "
+                f"AND tenant IN ({', '.join('?' * len(tenants))}) AND (? OR priority != ?) "
+                f"ORDER BY (CASE priority {rank} ELSE {len(PRIORITY_CLASSES)} END) - (? - created_at) / ?, "
+                "created_at LIMIT 1",
+                (JOB_QUEUED, *tenants, allow_batch, PRIORITY_BATCH, now, PRIORITY_AGING_SECONDS)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker_id = ?, attempts = attempts + 1, "
+                "started_at = ?, lease_expires_at = ? WHERE id = ?",
+                (JOB_RUNNING, worker_id, now, now + self.lease_seconds, row["id"])
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        return {
+            "id": row["id"],
+            "kind": row["kind"],
+            "payload": json.loads(row["payload"]),
+            "file_data": row["file_data"],
+            "attempts": row["attempts"] + 1,
+            "priority": row["priority"],
+            "tenant": row["tenant"],
+            "worker_id": worker_id
+        }
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """Extend a running job's lease; False once the job is no longer this worker's"""
+        conn = self._connect()
+        try:
+            cur = conn.execute(
+                "UPDATE jobs SET lease_expires_at = ? WHERE id = ? AND worker_id = ? AND status = ?",
+                (time.time() + self.lease_seconds, job_id, worker_id, JOB_RUNNING)
+            )
+            return bool(cur.rowcount)
+        finally:
+            conn.close()
+
+    def complete(self, job_id: str, result: Dict[str, Any], worker_id: Optional[str] = None):
+        """Store a job's result, unless it was cancelled while running or its lease was lost.
+
+        The uploaded file is dropped once the job succeeds; cancelled jobs keep it for retry().
+        """
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE jobs SET status = CASE WHEN cancel_requested THEN ? ELSE ? END, "
+                "result = CASE WHEN cancel_requested THEN NULL ELSE ? END, "
+                "file_data = CASE WHEN cancel_requested THEN file_data ELSE NULL END, "
+                "finished_at = ?, lease_expires_at = NULL WHERE id = ? AND status = ? "
+                "AND (? IS NULL OR worker_id = ?)",
+                (JOB_CANCELLED, JOB_SUCCEEDED, json.dumps(result), time.time(), job_id, JOB_RUNNING,
+                 worker_id, worker_id)
+            )
+        finally:
+            conn.close()
+
+    def fail(self, job_id: str, error: str, worker_id: Optional[str] = None):
+        """Record a failed attempt and requeue the job while it has attempts left"""
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE jobs SET status = CASE "
+                "WHEN cancel_requested THEN ? "
+                "WHEN attempts < max_attempts THEN ? ELSE ? END, "
+                "error = ?, worker_id = NULL, lease_expires_at = NULL, "
+                "finished_at = CASE WHEN cancel_requested OR attempts >= max_attempts THEN ? ELSE NULL END "
+                "WHERE id = ? AND status = ? AND (? IS NULL OR worker_id = ?)",
+                (JOB_CANCELLED, JOB_QUEUED, JOB_FAILED, error, time.time(), job_id, JOB_RUNNING,
+                 worker_id, worker_id)
+            )
+        finally:
+            conn.close()
+
+    def is_cancel_requested(self, job_id: str) -> bool:
+        """Whether cancel() flagged this running job; polled by the worker between analysis steps"""
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+        return bool(row and row["cancel_requested"])
+
+    def purge_finished(self, older_than: float = JOB_RETENTION_SECONDS) -> int:
+        """Delete jobs that finished more than older_than seconds ago, with their files and results"""
+        conn = self._connect()
+        try:
+            cur = conn.execute(
+                f"DELETE FROM jobs WHERE status IN ({', '.join('?' * len(FINISHED_STATUSES))}) AND finished_at < ?",
+                (*FINISHED_STATUSES, time.time() - older_than)
+            )
+            return cur.rowcount
+        finally:
+            conn.close()
+
+    def queue_depth(self) -> Dict[str, int]:
+        """Count jobs per status"""
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        finally:
+            conn.close()
+        return {row["status"]: row["n"] for row in rows}
+
+    def queue_depth_by_priority(self) -> Dict[str, Dict[str, int]]:
+        """Count queued and running jobs per priority class"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT priority, status, COUNT(*) AS n FROM jobs WHERE status IN (?, ?) "
+                "GROUP BY priority, status",
+                ACTIVE_STATUSES
+            ).fetchall()
+        finally:
+            conn.close()
+
+        depth = {cls: {status: 0 for status in ACTIVE_STATUSES} for cls in PRIORITY_CLASSES}
+        for row in rows:
+            depth.setdefault(row["priority"], {status: 0 for status in ACTIVE_STATUSES})[row["status"]] = row["n"]
+        return depth
+
+
+def _heartbeat(queue: JobQueue, job_id: str, worker_id: str, done: threading.Event):
+    """Keep renewing a job's lease so a long analysis is not claimed a second time"""
+    interval = max(1.0, queue.lease_seconds / 3)
+    while not done.wait(interval):
+        try:
+            if not queue.heartbeat(job_id, worker_id):
+                logger.warning(f"Lost the lease on job {job_id}")
+                return
+        except Exception as e:
+            logger.error(f"Heartbeat for job {job_id} failed: {e}")
+
+
+def _index_candidate(candidates, job: Dict[str, Any], result: Dict[str, Any]):
+    """Add a finished analysis to the candidate search index"""
+    try:
+        candidates.add_analysis(result)
+    except Exception as e:
+        logger.error(f"Failed to index job {job['id']} for candidate search: {e}")
+
+
+def _run_job(backend, queue: JobQueue, job: Dict[str, Any], candidates=None):
+    """Execute one claimed job against a warm backend"""
+    job_id = job["id"]
+    worker_id = job.get("worker_id")
+    # Batch jobs hand their LLM calls to the scheduler's lowest class
+    backend.traffic_class = PRIORITY_BATCH if job.get("priority") == PRIORITY_BATCH else None
+
+    done = threading.Event()
+    if worker_id:
+        threading.Thread(target=_heartbeat, args=(queue, job_id, worker_id, done), daemon=True).start()
+    try:
+        if job["kind"] == "analyze_resume":
+            payload = job["payload"]
+            upload = StoredUpload(payload["name"], payload["type"], job["file_data"])
+            # Cancelling a running job stops it at the next step instead of only discarding its result
+            result = backend.analyze_resume(upload, should_cancel=lambda: queue.is_cancel_requested(job_id))
+            if not result.get("success"):
+                queue.fail(job_id, result.get("error", "Unknown error"), worker_id)
+                return
+        else:
+            raise ValueError(f"Unknown job kind: {job['kind']}")
+
+        queue.complete(job_id, result, worker_id)
+        logger.info(f"Completed job {job_id}")
+        if candidates is not None:
+            _index_candidate(candidates, job, result)
+    except Exception as e:
+        # fail() records a job flagged for cancellation as cancelled
+        if queue.is_cancel_requested(job_id):
+            logger.info(f"Cancelled job {job_id}")
+        else:
+            logger.error(f"Job {job_id} failed: {e}")
+        queue.fail(job_id, str(e), worker_id)
+    finally:
+        done.set()
+
+
+def _worker_main(db_path: str, api_keys, poll_interval: float, stop_event, allow_batch: bool = True):
+    """Worker process entry point: drain the queue with a warm backend per API key.
+
+    api_keys maps tenant_for(key) to key and is shared in memory with the
+    pool's owner; keys are never written to the database.
+    """
+    from backend import CareerNavigatorBackend
+
+    worker_id = f"{socket.gethostname()}-{os.getpid()}"
+    backends: "OrderedDict[str, Any]" = OrderedDict()
+
+    def backend_for(tenant: str):
+        if tenant in backends:
+            backends.move_to_end(tenant)
+            return backends[tenant]
+        backend = CareerNavigatorBackend(api_keys[tenant])
+        # Cached per process, so every backend in this worker shares one NER model
+        backend.ner_model = backend._setup_ner_model()
+        backends[tenant] = backend
+        if len(backends) > WORKER_MAX_BACKENDS:
+            backends.popitem(last=False)
+        return backend
+
+    candidates = None
+    if CANDIDATE_INDEX_PATH:
+        try:
+            candidates = CandidateSearch(CANDIDATE_INDEX_PATH)
+        except Exception as e:
+            logger.error(f"Worker {worker_id} failed to open candidate index, not indexing: {e}")
+
+    queue = JobQueue(db_path)
+    next_purge = 0.0
+    logger.info(f"Worker {worker_id} ready{'' if allow_batch else ' (interactive jobs only)'}")
+
+    while not stop_event.is_set():
+        try:
+            # Only jobs whose submitter's key this pool holds can be run
+            job = queue.claim_next(worker_id, list(api_keys.keys()), allow_batch)
+        except Exception as e:
+            logger.error(f"Worker {worker_id} failed to claim job: {e}")
+            job = None
+
+        if job is None:
+            if time.time() >= next_purge:
+                next_purge = time.time() + PURGE_INTERVAL_SECONDS
+                try:
+                    queue.purge_finished()
+                except Exception as e:
+                    logger.error(f"Worker {worker_id} failed to purge finished jobs: {e}")
+            stop_event.wait(poll_interval)
+            continue
+
+        try:
+            backend = backend_for(job["tenant"])
+        except Exception as e:
+            logger.error(f"Worker {worker_id} failed to initialize backend: {e}")
+            queue.fail(job["id"], f"Failed to initialize backend: {e}", job["worker_id"])
+            continue
+
+        _run_job(backend, queue, job, candidates)
+
+    logger.info(f"Worker {worker_id} stopped")
+
+
+class WorkerPool:
+    """A fixed number of worker processes shared by every API key.
+
+    Keys are registered with add_key() and handed to the workers in memory
+    only; a job is claimed only once its tenant's key has been registered,
+    so it always runs under the credentials it was submitted with.
+    """
+
+    def __init__(self, groq_api_key: Optional[str] = None, num_workers: int = 2,
+                 db_path: str = DEFAULT_DB_PATH, poll_interval: float = 0.5,
+                 reserved_interactive: int = RESERVED_INTERACTIVE_WORKERS):
+        self.num_workers = num_workers
+        self.db_path = db_path
+        self.poll_interval = poll_interval
+        # At least one worker always stays free to take batch jobs
+        self.reserved_interactive = max(0, min(reserved_interactive, num_workers - 1))
+        self._ctx = multiprocessing.get_context("spawn")
+        self._stop_event = self._ctx.Event()
+        self._manager = self._ctx.Manager()
+        self._api_keys = self._manager.dict()
+        self.processes: List[Optional[multiprocessing.Process]] = [None] * num_workers
+        if groq_api_key is not None:
+            self.add_key(groq_api_key)
+
+    def add_key(self, api_key: str) -> str:
+        """Let the workers run jobs submitted under this key; returns the key's tenant"""
+        tenant = tenant_for(api_key)
+        if self._api_keys.get(tenant) != api_key:
+            self._api_keys[tenant] = api_key
+        return tenant
+
+    def start(self):
+        """Spawn worker processes, replacing any that have died"""
+        for slot, process in enumerate(self.processes):
+            if process is not None and process.is_alive():
+                continue
+            allow_batch = slot >= self.reserved_interactive
+            process = self._ctx.Process(
+                target=_worker_main,
+                args=(self.db_path, self._api_keys, self.poll_interval, self._stop_event, allow_batch),
+                daemon=True
+            )
+            process.start()
+            self.processes[slot] = process
+        return self
+
+    def stop(self, timeout: float = 10.0):
+        """Ask workers to finish their current job and exit"""
+        self._stop_event.set()
+        for process in self.processes:
+            if process is None:
+                continue
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self.processes = [None] * self.num_workers
+        self._manager.shutdown()
+
+    def alive(self) -> int:
+        return sum(1 for p in self.processes if p is not None and p.is_alive())
+
+
+if __name__ == "__main__":
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Run Career Navigator analysis workers")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("JOB_QUEUE_WORKERS", "2")))
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    parser.add_argument("--enqueue", nargs="+", metavar="RESUME",
+                        help="queue these PDF/DOCX files as batch analysis jobs and exit")
+    args = parser.parse_args()
+
+    api_key = os.getenv("GROQ_API_KEY", "")
+    if args.enqueue:
+        queue = JobQueue(args.db)
+        for path in args.enqueue:
+            with open(path, "rb") as f:
+                upload = StoredUpload(os.path.basename(path), mimetypes.guess_type(path)[0] or "", f.read())
+            print(queue.submit_analysis(upload, priority=PRIORITY_BATCH, tenant=tenant_for(api_key)))
+        raise SystemExit(0)
+
+    if not api_key and LLM_PROVIDER == PROVIDER_GROQ:
+        raise SystemExit("GROQ_API_KEY is not set")
+
+    pool = WorkerPool(api_key, num_workers=args.workers, db_path=args.db).start()
+    logger.info(f"Started {args.workers} workers on {args.db}")
+    try:
+        while True:
+            time.sleep(5)
+            pool.start()
+    except KeyboardInterrupt:
+        pool.stop()
@@ -0,0 +1,94 @@
+import os
+import gzip
+import json
+import hashlib
+import logging
+import threading
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_RECORD = "record"
+CASSETTE_REPLAY = "replay"
+
+
+class CassetteMissError(RuntimeError):
+    """Raised in replay mode when a prompt was never recorded"""
+
+
+class Cassette:
+    """Content-addressed store of rendered prompts and raw completions.
+
+    The file is a sequence of gzip members, one JSON record per line, so
+    several recording processes can append to it safely and the whole
+    thing still reads back as a single gzip stream. Records are keyed by
+    a hash of the model and the rendered prompt. A prompt sent several
+    times (e.g. an interview's question calls) keeps every completion,
+    and replay returns them in recorded order, repeating the last one
+    once they run out.
+    """
+
+    def __init__(self, path: str, mode: str, model: str = ""):
+        if mode not in (CASSETTE_RECORD, CASSETTE_REPLAY):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.model = model
+        self.entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._played: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        if os.path.exists(path):
+            self._load()
+        elif mode == CASSETTE_REPLAY:
+            raise FileNotFoundError(f"Cassette not found: {path}")
+
+    @classmethod
+    def from_env(cls, model: str = "") -> Optional["Cassette"]:
+        """Cassette configured by LLM_CASSETTE_MODE / LLM_CASSETTE_PATH, or None"""
+        mode = os.getenv("LLM_CASSETTE_MODE")
+        if not mode:
+            return None
+        return cls(os.getenv("LLM_CASSETTE_PATH", "llm_cassette.jsonl.gz"), mode, model)
+
+    def _load(self):
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    self.entries.setdefault(record["key"], []).append(record)
+        logger.info(f"Loaded {sum(map(len, self.entries.values()))} cassette entries "
+                    f"for {len(self.entries)} prompts from {self.path}")
+
+    def key(self, prompt: str) -> str:
+        return hashlib.sha256(f"{self.model}\0{prompt}".encode("utf-8")).hexdigest()
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == CASSETTE_RECORD
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == CASSETTE_REPLAY
+
+    def play(self, chain: str, prompt: str) -> str:
+        """Next recorded completion for a prompt; fails loudly if there is none"""
+        key = self.key(prompt)
+        with self._lock:
+            records = self.entries.get(key)
+            if not records:
+                raise CassetteMissError(
+                    f"No recorded completion for '{chain}' prompt in {self.path}: {prompt[:200]!r}"
+                )
+            occurrence = self._played.get(key, 0)
+            self._played[key] = occurrence + 1
+        return records[min(occurrence, len(records) - 1)]["completion"]
+
+    def record(self, chain: str, prompt: str, completion: str):
+        """Append a prompt/completion pair to the cassette"""
+        record = {"key": self.key(prompt), "chain": chain, "prompt": prompt, "completion": completion}
+        data = gzip.compress((json.dumps(record) + "\n").encode("utf-8"))
+        with self._lock:
+            self.entries.setdefault(record["key"], []).append(record)
+            with open(self.path, "ab") as f:
+                f.write(data)
@@ -0,0 +1,163 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+import urllib.request
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Any, Optional
+
+from langchain_core.language_models.llms import LLM
+
+from llm_resilience import ResilientCaller
+from llm_scheduler import PriorityScheduler, PRIORITY_ANALYSIS
+
+logger = logging.getLogger(__name__)
+
+PROVIDER_GROQ = "groq"
+PROVIDER_LOCAL = "local"
+
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", PROVIDER_GROQ)
+LLM_TEMPERATURE = 0.3
+
+GROQ_MODEL_NAME = os.getenv("GROQ_MODEL", "llama3-8b-8192")
+GROQ_MAX_CONCURRENCY = int(os.getenv("GROQ_MAX_CONCURRENCY", "8"))
+
+# Any OpenAI-compatible server on this host: llama.cpp's llama-server, Ollama, vLLM, ...
+LOCAL_LLM_BASE_URL = os.getenv("LOCAL_LLM_BASE_URL", "http://127.0.0.1:8080/v1")
+LOCAL_LLM_MODEL = os.getenv("LOCAL_LLM_MODEL", "llama-3-8b-instruct-q4_k_m")
+LOCAL_LLM_MAX_CONCURRENCY = int(os.getenv("LOCAL_LLM_MAX_CONCURRENCY", "1"))
+LOCAL_LLM_TIMEOUT = float(os.getenv("LOCAL_LLM_TIMEOUT", "120"))
+
+_schedulers: Dict[str, PriorityScheduler] = {}
+_resilience: Dict[str, ResilientCaller] = {}
+_schedulers_lock = threading.Lock()
+
+
+def _provider_scheduler(key: str, max_concurrency: int) -> PriorityScheduler:
+    """Concurrency slots shared by every backend in this process that talks to the same endpoint"""
+    with _schedulers_lock:
+        if key not in _schedulers:
+            _schedulers[key] = PriorityScheduler(max_concurrency)
+        return _schedulers[key]
+
+
+def tenant_for(api_key: str) -> str:
+    """Opaque id for the credentials a call or job runs under; the key itself is never stored.
+
+    Only Groq depends on the key, so every local-provider caller shares the empty tenant.
+    """
+    if LLM_PROVIDER != PROVIDER_GROQ or not api_key:
+        return ""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+def _provider_resilience(key: str) -> ResilientCaller:
+    """Circuit breaker, latency windows and hedge budget shared by every backend using the same
+    endpoint with the same credentials, so one user's bad or rate-limited key cannot trip them for others"""
+    with _schedulers_lock:
+        if key not in _resilience:
+            _resilience[key] = ResilientCaller()
+        return _resilience[key]
+
+
+class LocalChatLLM(LLM):
+    """Chat completions from an OpenAI-compatible HTTP endpoint, bypassing any proxy"""
+
+    base_url: str = LOCAL_LLM_BASE_URL
+    model: str = LOCAL_LLM_MODEL
+    temperature: float = LLM_TEMPERATURE
+    timeout: float = LOCAL_LLM_TIMEOUT
+    max_tokens: Optional[int] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "local-openai-compatible"
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> str:
+        payload: Dict[str, Any] = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": self.temperature
+        }
+        if stop:
+            payload["stop"] = stop
+        if self.max_tokens:
+            payload["max_tokens"] = self.max_tokens
+
+        request = urllib.request.Request(
+            f"{self.base_url.rstrip('/')}/chat/completions",
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"}
+        )
+        # The endpoint is on-prem, so never route it through HTTP(S)_PROXY
+        opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+        with opener.open(request, timeout=self.timeout) as response:
+            body = json.loads(response.read().decode("utf-8"))
+        return body["choices"][0]["message"]["content"]
+
+
+class LLMProvider(ABC):
+    """An LLM backend for the chains plus a per-endpoint, priority-scheduled cap on concurrent calls"""
+
+    name = ""
+
+    def __init__(self, model: str, max_concurrency: int, endpoint: str, tenant: str = ""):
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.endpoint = endpoint
+        key = f"{self.name}:{endpoint}:{model}"
+        self.scheduler = _provider_scheduler(key, max_concurrency)
+        self.resilience = _provider_resilience(f"{key}:{tenant}")
+
+    @abstractmethod
+    def build_llm(self):
+        """LangChain LLM the chains run on"""
+
+    def call(self, fn: Callable[[], Any], priority: str = PRIORITY_ANALYSIS,
+             cancelled: Optional[threading.Event] = None) -> Any:
+        """Run fn in one of this provider's concurrency slots once the scheduler reaches it"""
+        return self.scheduler.call(priority, fn, cancelled)
+
+    def describe(self) -> str:
+        return f"{self.name}:{self.model}"
+
+
+class GroqProvider(LLMProvider):
+    """Hosted inference on Groq"""
+
+    name = PROVIDER_GROQ
+
+    def __init__(self, api_key: str, model: str = GROQ_MODEL_NAME,
+                 max_concurrency: int = GROQ_MAX_CONCURRENCY):
+        super().__init__(model, max_concurrency, "api.groq.com", tenant_for(api_key))
+        self.api_key = api_key
+
+    def build_llm(self):
+        from langchain_groq import ChatGroq
+        return ChatGroq(model_name=self.model, temperature=LLM_TEMPERATURE, api_key=self.api_key)
+
+
+class LocalProvider(LLMProvider):
+    """On-prem CPU inference through an OpenAI-compatible server on this host"""
+
+    name = PROVIDER_LOCAL
+
+    def __init__(self, base_url: str = LOCAL_LLM_BASE_URL, model: str = LOCAL_LLM_MODEL,
+                 max_concurrency: int = LOCAL_LLM_MAX_CONCURRENCY, timeout: float = LOCAL_LLM_TIMEOUT):
+        super().__init__(model, max_concurrency, base_url)
+        self.base_url = base_url
+        self.timeout = timeout
+
+    def build_llm(self):
+        return LocalChatLLM(base_url=self.base_url, model=self.model, timeout=self.timeout)
+
+
+def provider_from_env(groq_api_key: str = "", name: Optional[str] = None) -> LLMProvider:
+    """Provider selected by LLM_PROVIDER (default groq), configured from its own env vars"""
+    name = name or LLM_PROVIDER
+    if name == PROVIDER_GROQ:
+        return GroqProvider(groq_api_key)
+    if name == PROVIDER_LOCAL:
+        return LocalProvider()
+    raise ValueError(f"Unknown LLM provider: {name}")
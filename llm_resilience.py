@@ -0,0 +1,249 @@
+import os
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, Any, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEADLINE_SECONDS = float(os.getenv("LLM_DEADLINE_SECONDS", "30"))
+CHAIN_DEADLINES = {
+    'question': 15.0,
+    'evaluate': 30.0,
+    'role': 20.0,
+    'ats': 45.0,
+    'summarize': 45.0
+}
+HEDGING_ENABLED = os.getenv("LLM_HEDGING", "0") == "1"
+HEDGE_BUDGET_RATIO = float(os.getenv("LLM_HEDGE_BUDGET", "0.1"))
+HEDGE_MIN_SAMPLES = 20
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+LATENCY_WINDOW = 1000
+
+
+class DeadlineExceeded(TimeoutError):
+    """An LLM call did not finish within its chain's deadline"""
+
+
+class CircuitOpenError(RuntimeError):
+    """The provider is considered unhealthy and calls are being short-circuited"""
+
+
+class CallAbandoned(RuntimeError):
+    """A queued attempt was dropped because its caller no longer needed it"""
+
+
+class LatencyTracker:
+    """Rolling per-key latency samples with percentile summaries"""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self._samples: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self.window)).append(seconds)
+
+    def count(self, key: str) -> int:
+        with self._lock:
+            return len(self._samples.get(key, ()))
+
+    def percentile(self, key: str, p: float) -> Optional[float]:
+        with self._lock:
+            samples = list(self._samples.get(key, ()))
+        return float(np.percentile(samples, p)) if samples else None
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            snapshot = {key: list(samples) for key, samples in self._samples.items()}
+        return {
+            key: {
+                "count": len(samples),
+                "p50": float(np.percentile(samples, 50)),
+                "p95": float(np.percentile(samples, 95)),
+                "p99": float(np.percentile(samples, 99))
+            }
+            for key, samples in snapshot.items() if samples
+        }
+
+
+def is_client_error(error: BaseException) -> bool:
+    """4xx responses (bad or unauthorized key, malformed request, a key's own rate limit) say
+    nothing about the provider's health"""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if status is None:
+        status = getattr(error, "code", None)
+    return isinstance(status, int) and 400 <= status < 500
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures, then lets a single probe through after a cool-down"""
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_seconds: float = BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_seconds:
+                self.state = "half_open"
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self.state = "closed"
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                if self.state != "open":
+                    logger.warning(f"LLM circuit breaker opened after {self._failures} failures")
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+
+class HedgeBudget:
+    """Caps hedged requests at a fraction of all requests"""
+
+    def __init__(self, ratio: float = HEDGE_BUDGET_RATIO):
+        self.ratio = ratio
+        self.calls = 0
+        self.hedges = 0
+        self._lock = threading.Lock()
+
+    def record_call(self):
+        with self._lock:
+            self.calls += 1
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self.hedges + 1 > self.ratio * self.calls:
+                return False
+            self.hedges += 1
+            return True
+
+
+class ResilientCaller:
+    """Runs LLM calls under per-chain deadlines, optional p95 hedging and a circuit breaker.
+
+    Two latency views are kept: "provider" is every individual attempt (what
+    callers waited before this layer existed), "caller" is what the caller
+    actually waited including hedges, deadlines and fast failures.
+    """
+
+    def __init__(self, deadlines: Optional[Dict[str, float]] = None,
+                 default_deadline: float = DEFAULT_DEADLINE_SECONDS,
+                 hedging: bool = HEDGING_ENABLED,
+                 hedge_budget: Optional[HedgeBudget] = None,
+                 breaker: Optional[CircuitBreaker] = None,
+                 max_workers: int = 16):
+        self.deadlines = dict(CHAIN_DEADLINES if deadlines is None else deadlines)
+        self.default_deadline = default_deadline
+        self.hedging = hedging
+        self.hedge_budget = hedge_budget or HedgeBudget()
+        self.breaker = breaker or CircuitBreaker()
+        self.provider_latency = LatencyTracker()
+        self.caller_latency = LatencyTracker()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-call")
+
+    def _hedge_delay(self, name: str) -> Optional[float]:
+        if not self.hedging or self.provider_latency.count(name) < HEDGE_MIN_SAMPLES:
+            return None
+        return self.provider_latency.percentile(name, 95)
+
+    def _submit(self, name: str, fn: Callable[[threading.Event], Any], cancelled: threading.Event):
+        def attempt():
+            start = time.perf_counter()
+            try:
+                result = fn(cancelled)
+            except CallAbandoned:
+                # Dropped before it reached the provider, so it says nothing about provider latency
+                raise
+            except Exception:
+                self.provider_latency.record(name, time.perf_counter() - start)
+                raise
+            self.provider_latency.record(name, time.perf_counter() - start)
+            return result
+        return self._executor.submit(attempt)
+
+    def call(self, name: str, fn: Callable[[threading.Event], Any]) -> Any:
+        """Run fn, returning the first successful attempt or raising on deadline/breaker.
+
+        fn receives an Event that is set once this call no longer needs the
+        attempt (deadline passed or another attempt won); pass it on to
+        PriorityScheduler.call so a still-queued attempt gives up its place.
+        """
+        start = time.perf_counter()
+        cancelled = threading.Event()
+        try:
+            if not self.breaker.allow():
+                raise CircuitOpenError(f"LLM provider unavailable, skipping '{name}' call")
+
+            deadline = start + self.deadlines.get(name, self.default_deadline)
+            self.hedge_budget.record_call()
+            pending = {self._submit(name, fn, cancelled)}
+            hedge_delay = self._hedge_delay(name)
+            last_error = None
+
+            while pending:
+                now = time.perf_counter()
+                if now >= deadline:
+                    break
+
+                timeout = deadline - now
+                can_hedge = hedge_delay is not None and len(pending) == 1
+                if can_hedge:
+                    timeout = min(timeout, max(start + hedge_delay - now, 0.0))
+
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        self.breaker.record_success()
+                        return future.result()
+                    last_error = future.exception()
+                    if is_client_error(last_error):
+                        # The provider answered; retrying or hedging will not change a 4xx
+                        self.breaker.record_success()
+                        raise last_error
+
+                if not done and can_hedge:
+                    if self.hedge_budget.try_acquire():
+                        logger.info(f"Hedging '{name}' call after {hedge_delay:.2f}s")
+                        pending.add(self._submit(name, fn, cancelled))
+                    hedge_delay = None
+
+            self.breaker.record_failure()
+            if last_error is not None and not pending:
+                raise last_error
+            raise DeadlineExceeded(f"'{name}' call exceeded its {self.deadlines.get(name, self.default_deadline):.0f}s deadline")
+        finally:
+            cancelled.set()
+            self.caller_latency.record(name, time.perf_counter() - start)
+
+    def latency_report(self) -> Dict[str, Any]:
+        """p50/p95/p99 per chain for raw attempts ("provider") and as seen by callers ("caller")"""
+        return {
+            "provider": self.provider_latency.summary(),
+            "caller": self.caller_latency.summary(),
+            "hedged_calls": self.hedge_budget.hedges,
+            "total_calls": self.hedge_budget.calls,
+            "breaker_state": self.breaker.state
+        }
@@ -0,0 +1,129 @@
+import os
+import time
+import itertools
+import threading
+from collections import deque
+from typing import Callable, Dict, Any, Optional
+
+from llm_resilience import LatencyTracker, CallAbandoned
+
+PRIORITY_INTERVIEW = "interactive_interview"
+PRIORITY_ANALYSIS = "interactive_analysis"
+PRIORITY_BATCH = "batch"
+# Highest priority first
+PRIORITY_CLASSES = (PRIORITY_INTERVIEW, PRIORITY_ANALYSIS, PRIORITY_BATCH)
+
+CHAIN_PRIORITIES = {
+    'question': PRIORITY_INTERVIEW,
+    'evaluate': PRIORITY_INTERVIEW,
+    'role': PRIORITY_ANALYSIS,
+    'ats': PRIORITY_ANALYSIS,
+    'summarize': PRIORITY_ANALYSIS
+}
+
+# Share of dispatches each backlogged class gets, as "interview,analysis,batch"
+_weights = [float(w) for w in os.getenv("LLM_SCHEDULER_WEIGHTS", "8,4,1").split(",")]
+DEFAULT_WEIGHTS = dict(zip(PRIORITY_CLASSES, _weights))
+# Slots batch calls may never occupy, so an interactive call never waits behind a full batch
+RESERVED_INTERACTIVE_SLOTS = int(os.getenv("LLM_RESERVED_INTERACTIVE_SLOTS", "1"))
+# How often a queued call re-checks whether its caller has given up
+CANCEL_POLL_SECONDS = 0.05
+
+
+class PriorityScheduler:
+    """Weighted fair queueing of LLM calls over a fixed number of concurrent slots.
+
+    Each call gets a virtual finish tag of max(virtual time, its class's last
+    tag) + 1/weight, and a free slot always goes to the smallest tag. A
+    backlogged class therefore receives its weighted share of dispatches: batch
+    can be slowed but never starved, and soaks up every slot interactive
+    traffic leaves idle, minus the reserved ones.
+    """
+
+    def __init__(self, max_concurrency: int, weights: Optional[Dict[str, float]] = None,
+                 reserved_interactive: int = RESERVED_INTERACTIVE_SLOTS):
+        self.max_concurrency = max_concurrency
+        self.weights = dict(DEFAULT_WEIGHTS if weights is None else weights)
+        self.batch_limit = max(1, max_concurrency - reserved_interactive)
+        self.wait_latency = LatencyTracker()
+        self._queues: Dict[str, deque] = {cls: deque() for cls in PRIORITY_CLASSES}
+        self._running: Dict[str, int] = {cls: 0 for cls in PRIORITY_CLASSES}
+        self._dispatched: Dict[str, int] = {cls: 0 for cls in PRIORITY_CLASSES}
+        self._abandoned: Dict[str, int] = {cls: 0 for cls in PRIORITY_CLASSES}
+        self._last_finish: Dict[str, float] = {cls: 0.0 for cls in PRIORITY_CLASSES}
+        self._virtual_time = 0.0
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    def _eligible(self, cls: str) -> bool:
+        return cls != PRIORITY_BATCH or self._running[cls] < self.batch_limit
+
+    def _next_ticket(self) -> Optional[list]:
+        if sum(self._running.values()) >= self.max_concurrency:
+            return None
+        heads = [queue[0] for cls, queue in self._queues.items() if queue and self._eligible(cls)]
+        return min(heads) if heads else None
+
+    def _abandon(self, ticket: list):
+        """Drop a ticket whose caller has left; called with the condition held"""
+        priority = ticket[2]
+        queue = self._queues[priority]
+        if queue[-1] is ticket:
+            # Nothing queued behind it, so the class does not pay for the dropped call
+            self._last_finish[priority] = ticket[3]
+        queue.remove(ticket)
+        self._abandoned[priority] += 1
+        self._cond.notify_all()
+
+    def call(self, priority: str, fn: Callable[[], Any],
+             cancelled: Optional[threading.Event] = None) -> Any:
+        """Wait for this call's turn under WFQ, then run fn in one of the slots.
+
+        If cancelled is set while the call is still queued (its caller hit a
+        deadline, or a hedge won), the ticket is dropped without taking a slot
+        and CallAbandoned is raised.
+        """
+        if priority not in self._queues:
+            raise ValueError(f"Unknown priority class: {priority}")
+
+        start = time.perf_counter()
+        with self._cond:
+            start_tag = max(self._virtual_time, self._last_finish[priority])
+            finish_tag = start_tag + 1.0 / self.weights[priority]
+            self._last_finish[priority] = finish_tag
+            ticket = [finish_tag, next(self._seq), priority, start_tag]
+            self._queues[priority].append(ticket)
+
+            while self._next_ticket() is not ticket:
+                if cancelled is not None and cancelled.is_set():
+                    self._abandon(ticket)
+                    raise CallAbandoned(f"Caller left before its {priority} call was scheduled")
+                self._cond.wait(CANCEL_POLL_SECONDS if cancelled is not None else None)
+
+            self._queues[priority].popleft()
+            self._virtual_time = start_tag
+            self._running[priority] += 1
+            self._dispatched[priority] += 1
+            # Another slot may still be free for the next head
+            self._cond.notify_all()
+        self.wait_latency.record(priority, time.perf_counter() - start)
+
+        try:
+            return fn()
+        finally:
+            with self._cond:
+                self._running[priority] -= 1
+                self._cond.notify_all()
+
+    def queue_depth(self) -> Dict[str, Dict[str, int]]:
+        """Waiting, running, total dispatched and abandoned calls per priority class"""
+        with self._cond:
+            return {
+                cls: {
+                    "queued": len(self._queues[cls]),
+                    "running": self._running[cls],
+                    "dispatched": self._dispatched[cls],
+                    "abandoned": self._abandoned[cls]
+                }
+                for cls in PRIORITY_CLASSES
+            }
@@ -0,0 +1,276 @@
+import os
+import json
+import time
+import queue
+import socket
+import struct
+import logging
+import argparse
+import threading
+import socketserver
+from concurrent.futures import Future
+from typing import List, Dict, Any, Optional, Union, Callable
+
+logger = logging.getLogger(__name__)
+
+NER_MODEL_NAME = "dslim/bert-base-NER"
+# Unset means every process loads its own model, as before
+NER_SERVER_SOCKET = os.getenv("NER_SERVER_SOCKET")
+DEFAULT_SOCKET_PATH = "/tmp/career_navigator_ner.sock"
+NER_MAX_BATCH = int(os.getenv("NER_MAX_BATCH", "16"))
+NER_BATCH_WAIT_MS = float(os.getenv("NER_BATCH_WAIT_MS", "5"))
+NER_CLIENT_TIMEOUT = float(os.getenv("NER_CLIENT_TIMEOUT", "30"))
+# How long a client that could not reach the server uses its in-process model before trying again
+NER_SERVER_RETRY_SECONDS = float(os.getenv("NER_SERVER_RETRY_SECONDS", "30"))
+
+_HEADER = struct.Struct("!I")
+
+
+def _send(sock: socket.socket, message: Dict[str, Any]):
+    data = json.dumps(message).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(data)) + data)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("NER server closed the connection")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _recv(sock: socket.socket) -> Dict[str, Any]:
+    (size,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    return json.loads(_recv_exact(sock, size).decode("utf-8"))
+
+
+def _plain_entities(entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Pipeline output with numpy scalars turned into JSON-safe Python values"""
+    return [
+        {key: (value.item() if hasattr(value, "item") else value) for key, value in entity.items()}
+        for entity in entities
+    ]
+
+
+class MicroBatcher:
+    """Collects texts from concurrent requests into one model call.
+
+    The first waiting request opens a batch; it closes after batch_wait
+    seconds or once max_batch texts have arrived, whichever comes first.
+    """
+
+    def __init__(self, model: Callable, max_batch: int = NER_MAX_BATCH,
+                 batch_wait: float = NER_BATCH_WAIT_MS / 1000):
+        self.model = model
+        self.max_batch = max_batch
+        self.batch_wait = batch_wait
+        self.batches = 0
+        self.texts = 0
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="ner-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, texts: List[str]) -> Future:
+        future = Future()
+        self._queue.put((texts, future))
+        return future
+
+    def _collect(self) -> List[tuple]:
+        pending = [self._queue.get()]
+        count = len(pending[0][0])
+        deadline = time.monotonic() + self.batch_wait
+        while count < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            pending.append(item)
+            count += len(item[0])
+        return pending
+
+    def _run(self):
+        while True:
+            pending = self._collect()
+            texts = [text for item_texts, _ in pending for text in item_texts]
+            try:
+                results = self.model(texts, batch_size=self.max_batch) if texts else []
+                self.batches += 1
+                self.texts += len(texts)
+            except Exception as e:
+                # One bad text must not fail every request merged into the batch
+                logger.error(f"NER batch of {len(texts)} texts failed, retrying its requests one by one: {e}")
+                for item_texts, future in pending:
+                    try:
+                        future.set_result([_plain_entities(r) for r in self.model(item_texts)])
+                    except Exception as item_error:
+                        future.set_exception(item_error)
+                continue
+
+            offset = 0
+            for item_texts, future in pending:
+                future.set_result([_plain_entities(r) for r in results[offset:offset + len(item_texts)]])
+                offset += len(item_texts)
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        batcher: MicroBatcher = self.server.batcher
+        while True:
+            try:
+                request = _recv(self.request)
+            except (ConnectionError, struct.error):
+                return
+
+            if request.get("ping"):
+                response = {"ok": True, "batches": batcher.batches, "texts": batcher.texts}
+            else:
+                try:
+                    response = {"entities": batcher.submit(request["texts"]).result()}
+                except Exception as e:
+                    response = {"error": str(e)}
+            try:
+                _send(self.request, response)
+            except OSError:
+                # The client timed out and closed its end
+                return
+
+
+class NERServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """One NER model per host, shared by local Streamlit and worker processes over a Unix socket"""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH, model: Optional[Callable] = None,
+                 model_name: str = NER_MODEL_NAME, max_batch: int = NER_MAX_BATCH,
+                 batch_wait: float = NER_BATCH_WAIT_MS / 1000):
+        if model is None:
+            from transformers import pipeline
+            model = pipeline("ner", model=model_name)
+        self.batcher = MicroBatcher(model, max_batch, batch_wait)
+
+        # A socket file left behind by a crashed server would block bind()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        super().__init__(socket_path, _RequestHandler)
+        self.socket_path = socket_path
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+class NERClient:
+    """Drop-in for the transformers NER pipeline that calls the host's NER server.
+
+    While the server cannot be reached, requests go to a model loaded
+    in-process, and the server is tried again every retry_seconds; once it
+    answers, the local model is released. A request that times out is an
+    error of that request, not a sign the server is gone.
+    """
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH, timeout: float = NER_CLIENT_TIMEOUT,
+                 fallback: Optional[Callable[[], Callable]] = None,
+                 retry_seconds: float = NER_SERVER_RETRY_SECONDS):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.fallback = fallback
+        self.retry_seconds = retry_seconds
+        self._local_model = None
+        self._retry_at = 0.0
+        self._local_lock = threading.Lock()
+        self._thread_state = threading.local()
+
+    def _connection(self) -> socket.socket:
+        """One persistent connection per calling thread"""
+        sock = getattr(self._thread_state, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._thread_state.sock = sock
+        return sock
+
+    def _request(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            sock = self._connection()
+            _send(sock, message)
+            return _recv(sock)
+        except (OSError, ConnectionError, struct.error):
+            # After a timeout the reply may still arrive, so the connection cannot be reused either
+            sock = getattr(self._thread_state, "sock", None)
+            if sock is not None:
+                sock.close()
+                self._thread_state.sock = None
+            raise
+
+    def ping(self) -> bool:
+        try:
+            return bool(self._request({"ping": True}).get("ok"))
+        except (OSError, ConnectionError, struct.error):
+            return False
+
+    def _local(self) -> Callable:
+        with self._local_lock:
+            if self._local_model is None:
+                logger.warning(f"NER server at {self.socket_path} unavailable, loading the model in-process")
+                self._local_model = self.fallback()
+            return self._local_model
+
+    def _release_local(self):
+        with self._local_lock:
+            if self._local_model is not None:
+                logger.info(f"NER server at {self.socket_path} is back, releasing the in-process model")
+                self._local_model = None
+
+    def __call__(self, texts: Union[str, List[str]], **kwargs) -> List:
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+
+        if self.fallback is None or time.monotonic() >= self._retry_at:
+            try:
+                response = self._request({"texts": batch})
+            except socket.timeout:
+                raise
+            except (OSError, ConnectionError, struct.error):
+                if self.fallback is None:
+                    raise
+                self._retry_at = time.monotonic() + self.retry_seconds
+            else:
+                if "error" in response:
+                    raise RuntimeError(f"NER server error: {response['error']}")
+                self._release_local()
+                return response["entities"][0] if single else response["entities"]
+
+        results = self._local()(batch)
+        return results[0] if single else results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the NER model to local Career Navigator processes")
+    parser.add_argument("--socket", default=NER_SERVER_SOCKET or DEFAULT_SOCKET_PATH)
+    parser.add_argument("--model", default=NER_MODEL_NAME)
+    parser.add_argument("--max-batch", type=int, default=NER_MAX_BATCH)
+    parser.add_argument("--batch-wait-ms", type=float, default=NER_BATCH_WAIT_MS)
+    args = parser.parse_args()
+
+    server = NERServer(args.socket, model_name=args.model, max_batch=args.max_batch,
+                       batch_wait=args.batch_wait_ms / 1000)
+    logger.info(f"NER server for {args.model} listening on {args.socket}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,101 @@
+import os
+import time
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pytesseract
+except ImportError:
+    pytesseract = None
+
+OCR_DPI = int(os.getenv("OCR_DPI", "200"))
+OCR_MAX_PAGES = int(os.getenv("OCR_MAX_PAGES", "5"))
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", "2"))
+OCR_LANGUAGE = os.getenv("OCR_LANGUAGE", "eng")
+
+# Pages with fewer extractable characters than this are treated as image-only
+MIN_TEXT_LAYER_CHARS = 20
+
+_executor = None
+
+
+def _ocr_page(pdf_bytes: bytes, page_number: int, dpi: int, language: str) -> Dict[str, Any]:
+    """Render one page to a grayscale bitmap and OCR it; runs inside a pool worker"""
+    import fitz
+    from PIL import Image
+
+    start = time.perf_counter()
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        pixmap = doc[page_number].get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+        image = Image.frombytes("L", (pixmap.width, pixmap.height), pixmap.samples)
+        text = pytesseract.image_to_string(image, lang=language)
+    finally:
+        doc.close()
+
+    return {"page": page_number + 1, "text": text, "seconds": time.perf_counter() - start}
+
+
+def _get_executor(workers: int):
+    """Shared pool for OCR; daemonic job workers cannot fork, so they fall back to threads"""
+    global _executor
+    if _executor is None:
+        if multiprocessing.current_process().daemon:
+            # Tesseract runs as a subprocess, so threads still overlap the expensive part
+            _executor = ThreadPoolExecutor(max_workers=workers)
+        else:
+            _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+def needs_ocr(page_text: str) -> bool:
+    return len(page_text.strip()) < MIN_TEXT_LAYER_CHARS
+
+
+def ocr_pages(pdf_bytes: bytes, page_numbers: List[int], dpi: int = OCR_DPI,
+              max_pages: int = OCR_MAX_PAGES, workers: int = OCR_WORKERS,
+              language: str = OCR_LANGUAGE) -> Dict[str, Any]:
+    """OCR the given zero-based pages in parallel, up to max_pages of them.
+
+    Returns the recognised text per page plus a report of which pages were
+    OCR'd, how long each took and which were skipped by the page cap.
+    """
+    report = {"dpi": dpi, "ocr_pages": [], "skipped_pages": [], "total_seconds": 0.0, "error": None}
+    texts = {}
+
+    if not page_numbers:
+        return {"texts": texts, "report": report}
+
+    if pytesseract is None:
+        report["error"] = "pytesseract is not installed"
+        report["skipped_pages"] = [n + 1 for n in page_numbers]
+        logger.warning(f"Skipping OCR of {len(page_numbers)} image-only pages: pytesseract is not installed")
+        return {"texts": texts, "report": report}
+
+    selected = page_numbers[:max_pages]
+    report["skipped_pages"] = [n + 1 for n in page_numbers[max_pages:]]
+
+    start = time.perf_counter()
+    try:
+        executor = _get_executor(workers)
+        futures = [executor.submit(_ocr_page, pdf_bytes, n, dpi, language) for n in selected]
+        for future in futures:
+            result = future.result()
+            texts[result["page"] - 1] = result["text"]
+            report["ocr_pages"].append({
+                "page": result["page"],
+                "seconds": round(result["seconds"], 3),
+                "chars": len(result["text"].strip())
+            })
+    except Exception as e:
+        logger.error(f"Failed to OCR PDF pages: {e}")
+        report["error"] = str(e)
+
+    report["total_seconds"] = round(time.perf_counter() - start, 3)
+    if report["ocr_pages"]:
+        logger.info(f"OCR'd {len(report['ocr_pages'])} pages in {report['total_seconds']}s")
+    return {"texts": texts, "report": report}
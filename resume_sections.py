@@ -0,0 +1,221 @@
+import re
+import logging
+from collections import Counter
+from typing import List, Dict, Any, Optional, Set
+
+from analysis_cache import content_hash
+
+logger = logging.getLogger(__name__)
+
+CONTACT = "Contact"
+SUMMARY = "Summary"
+EXPERIENCE = "Experience"
+EDUCATION = "Education"
+SKILLS = "Skills"
+PROJECTS = "Projects"
+OTHER = "Other"
+
+SECTION_NAMES = [CONTACT, SUMMARY, EXPERIENCE, EDUCATION, SKILLS, PROJECTS, OTHER]
+
+# Exact heading texts (lowercased, punctuation stripped) mapped to canonical sections
+HEADING_ALIASES = {
+    "contact": CONTACT, "contact information": CONTACT, "contact details": CONTACT,
+    "personal information": CONTACT, "personal details": CONTACT,
+    "summary": SUMMARY, "professional summary": SUMMARY, "career summary": SUMMARY,
+    "profile": SUMMARY, "professional profile": SUMMARY, "objective": SUMMARY,
+    "career objective": SUMMARY, "about me": SUMMARY, "about": SUMMARY,
+    "experience": EXPERIENCE, "work experience": EXPERIENCE, "professional experience": EXPERIENCE,
+    "employment": EXPERIENCE, "employment history": EXPERIENCE, "work history": EXPERIENCE,
+    "career history": EXPERIENCE, "internships": EXPERIENCE, "relevant experience": EXPERIENCE,
+    "education": EDUCATION, "academic background": EDUCATION, "academics": EDUCATION,
+    "qualifications": EDUCATION, "education and training": EDUCATION,
+    "skills": SKILLS, "technical skills": SKILLS, "core competencies": SKILLS,
+    "key skills": SKILLS, "competencies": SKILLS, "technologies": SKILLS, "tools": SKILLS,
+    "skills and tools": SKILLS, "technical expertise": SKILLS, "areas of expertise": SKILLS,
+    "projects": PROJECTS, "personal projects": PROJECTS, "academic projects": PROJECTS,
+    "key projects": PROJECTS, "selected projects": PROJECTS,
+    "certifications": OTHER, "awards": OTHER, "achievements": OTHER, "publications": OTHER,
+    "languages": OTHER, "interests": OTHER, "hobbies": OTHER, "volunteering": OTHER,
+    "references": OTHER, "activities": OTHER, "leadership": OTHER,
+}
+
+# Single words that identify a section inside a longer, heading-shaped line
+HEADING_KEYWORDS = {
+    "contact": CONTACT, "summary": SUMMARY, "profile": SUMMARY, "objective": SUMMARY,
+    "experience": EXPERIENCE, "employment": EXPERIENCE, "education": EDUCATION,
+    "skills": SKILLS, "competencies": SKILLS, "projects": PROJECTS,
+}
+
+MAX_HEADING_CHARS = 40
+MAX_HEADING_WORDS = 5
+
+_NON_WORD_RE = re.compile(r"[^a-z ]+")
+
+
+def _normalize_heading(line: str) -> str:
+    text = line.strip().lower().replace("&", " and ")
+    return " ".join(_NON_WORD_RE.sub(" ", text).split())
+
+
+class Section:
+    """A span of resume text under one heading"""
+
+    def __init__(self, name: str, heading: str, start: int, end: int):
+        self.name = name
+        self.heading = heading
+        self.start = start
+        self.end = end
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "heading": self.heading, "start": self.start, "end": self.end}
+
+
+class SectionIndex:
+    """Sections of one resume with character offsets into the extracted text"""
+
+    def __init__(self, text: str, sections: List[Section], has_structure: bool):
+        self.text = text
+        self.sections = sections
+        self.has_structure = has_structure
+
+    def body(self, section: Section) -> str:
+        return self.text[section.start:section.end].strip()
+
+    def names(self) -> List[str]:
+        return list(dict.fromkeys(s.name for s in self.sections))
+
+    def get(self, name: str) -> str:
+        """Concatenated body of every section with the given canonical name"""
+        return "\n".join(self.body(s) for s in self.sections if s.name == name)
+
+    def render(self, names: Optional[List[str]] = None) -> str:
+        """Selected sections in document order, each under its original heading.
+
+        Falls back to the full text when no headings were found or none of the
+        requested sections exist, so callers always get usable input.
+        """
+        if names is None or not self.has_structure:
+            return self.text
+
+        parts = []
+        for section in self.sections:
+            if section.name in names:
+                body = self.body(section)
+                if body:
+                    parts.append(f"{section.heading}\n{body}" if section.heading else body)
+
+        return "\n\n".join(parts) if parts else self.text
+
+    def section_hashes(self) -> Dict[str, str]:
+        """Map each section label to the hash of its content"""
+        hashes = {}
+        for section in self.sections:
+            label = section.heading or section.name
+            key = label
+            suffix = 2
+            while key in hashes:
+                key = f"{label} ({suffix})"
+                suffix += 1
+            hashes[key] = content_hash(self.body(section))
+        return hashes
+
+    def to_dict(self) -> List[Dict[str, Any]]:
+        return [s.to_dict() for s in self.sections]
+
+
+class ResumeSegmenter:
+    """Rule-based resume segmenter driven by heading text and optional font hints"""
+
+    def classify_heading(self, line: str, heading_hints: Optional[Set[str]] = None) -> Optional[str]:
+        """Return the canonical section a line opens, or None if it is body text"""
+        stripped = line.strip()
+        if not stripped or len(stripped) > MAX_HEADING_CHARS:
+            return None
+
+        normalized = _normalize_heading(stripped)
+        words = normalized.split()
+        if not words or len(words) > MAX_HEADING_WORDS:
+            return None
+
+        if normalized in HEADING_ALIASES:
+            return HEADING_ALIASES[normalized]
+
+        # Longer lines only count as headings when they look like one
+        looks_like_heading = (
+            (heading_hints is not None and stripped in heading_hints)
+            or stripped.endswith(":")
+            or (stripped.isupper() and sum(c.isalpha() for c in stripped) >= 3)
+        )
+        if not looks_like_heading:
+            return None
+
+        for word in words:
+            if word in HEADING_KEYWORDS:
+                return HEADING_KEYWORDS[word]
+
+        # Styled lines that name no section (job titles, employers, the candidate's
+        # name) stay in the section they appear in
+        return None
+
+    def segment(self, text: str, heading_hints: Optional[Set[str]] = None) -> SectionIndex:
+        """Build the section index for one document in a single pass over its lines"""
+        sections = []
+        current_name = CONTACT
+        current_heading = ""
+        current_start = 0
+        has_structure = False
+
+        offset = 0
+        for line in text.splitlines(keepends=True):
+            name = self.classify_heading(line, heading_hints)
+            if name is not None:
+                if text[current_start:offset].strip():
+                    sections.append(Section(current_name, current_heading, current_start, offset))
+                current_name = name
+                current_heading = line.strip().rstrip(":")
+                current_start = offset + len(line)
+                has_structure = True
+            offset += len(line)
+
+        if text[current_start:].strip():
+            sections.append(Section(current_name, current_heading, current_start, len(text)))
+
+        return SectionIndex(text, sections, has_structure)
+
+
+def pdf_heading_hints(doc) -> Set[str]:
+    """Collect PDF lines set larger or bolder than body text, using PyMuPDF span info"""
+    lines = []
+    size_counts = Counter()
+
+    try:
+        for page in doc:
+            for block in page.get_text("dict").get("blocks", []):
+                for line in block.get("lines", []):
+                    spans = [s for s in line.get("spans", []) if s.get("text", "").strip()]
+                    if not spans:
+                        continue
+                    line_text = "".join(s["text"] for s in spans).strip()
+                    max_size = max(round(s["size"], 1) for s in spans)
+                    bold = all(s.get("flags", 0) & 16 for s in spans)
+                    for s in spans:
+                        size_counts[round(s["size"], 1)] += len(s["text"])
+                    lines.append((line_text, max_size, bold))
+    except Exception as e:
+        logger.error(f"Failed to read PDF font information: {e}")
+        return set()
+
+    if not size_counts:
+        return set()
+
+    body_size = size_counts.most_common(1)[0][0]
+    # Job titles are often set a little larger than body text too. Section headings are the
+    # largest size used on more than one line; a single larger line is the candidate's name.
+    tier_lines = Counter(size for _, size, _ in lines if size >= body_size * 1.15)
+    repeated = [size for size, count in tier_lines.items() if count > 1]
+    heading_size = max(repeated or tier_lines or [float("inf")])
+    return {
+        text for text, size, bold in lines
+        # Bold alone also marks job titles and employers, so it only counts in capitals
+        if len(text) <= MAX_HEADING_CHARS and (size >= heading_size or (bold and text.isupper()))
+    }